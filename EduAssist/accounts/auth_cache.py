@@ -0,0 +1,68 @@
+"""
+Optional cache for the user that AuthenticationMiddleware loads on every
+request (AUTH_USER_CACHE_TIMEOUT seconds; 0 disables it).
+
+Entries are keyed by user id and store the user's session auth hash. A hit
+is used only when that hash matches the one in the session, so a password
+change logs other sessions out exactly as before. The user's Profile is
+cached with it (role checks read it); any save or delete of the User or its
+Profile drops the entry.
+"""
+import copy
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+USER_CACHE_KEY = 'auth_user:{}'
+PROFILE_BACKEND = 'accounts.backends.ProfileModelBackend'
+# Backend recorded in sessions that predate accounts.backends
+LEGACY_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def _cacheable(user):
+    # Only the profile is kept (its saves invalidate the entry); other related
+    # objects are left out so they are never served stale
+    cache_name = User.profile.related.cache_name
+    kept = {cache_name: user._state.fields_cache[cache_name]} if cache_name in user._state.fields_cache else {}
+    user = copy.copy(user)
+    user._state = copy.copy(user._state)
+    user._state.fields_cache = kept
+    return user
+
+
+def get_user(request):
+    """Drop-in for django.contrib.auth.get_user() that answers from the cache when it can."""
+    timeout = settings.AUTH_USER_CACHE_TIMEOUT
+    session = request.session
+    try:
+        user_id = get_user_model()._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)  # anonymous; only the session was read
+    if backend_path == LEGACY_BACKEND and backend_path not in settings.AUTHENTICATION_BACKENDS \
+            and PROFILE_BACKEND in settings.AUTHENTICATION_BACKENDS:
+        # Same users, loaded with their profile: keep these sessions signed in
+        session[BACKEND_SESSION_KEY] = backend_path = PROFILE_BACKEND
+    session_hash = session.get(HASH_SESSION_KEY)
+    if timeout <= 0 or not session_hash or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+
+    key = USER_CACHE_KEY.format(user_id)
+    cached = cache.get(key)
+    if cached and constant_time_compare(cached[0], session_hash):
+        user = cached[1]
+        user.backend = backend_path
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, (user.get_session_auth_hash(), _cacheable(user)), timeout)
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
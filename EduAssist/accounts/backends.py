@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the session user together with its Profile, so
+    role checks (accounts.roles) read user.profile instead of running their
+    own query.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        user = UserModel._default_manager.select_related('profile').filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
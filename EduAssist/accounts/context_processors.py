@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .roles import get_role, is_admin_role
+
+
+def user_role(request):
+    # Lazy: the role is only looked up when a template checks it
+    return {
+        'user_role': SimpleLazyObject(lambda: get_role(request) or ''),
+        'user_is_admin_role': SimpleLazyObject(lambda: is_admin_role(get_role(request))),
+    }
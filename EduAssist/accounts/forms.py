@@ -19,4 +19,27 @@ class SearchForm(forms.Form):
         required=False, 
         label='Search',
         widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search...'})
-    )
\ No newline at end of file
+    )
+
+class UserFilterForm(forms.Form):
+    """Server-side filters for the user management page (all optional)."""
+    search = forms.CharField(
+        required=False,
+        max_length=150,
+        widget=forms.TextInput(attrs={'class': 'modern-input', 'placeholder': 'Search name, program...'})
+    )
+    role = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All Roles')] + Profile.ROLE_CHOICES,
+        widget=forms.Select(attrs={'class': 'filter-select'})
+    )
+    program = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All Programs')] + Profile.PROGRAM_CHOICES,
+        widget=forms.Select(attrs={'class': 'filter-select'})
+    )
+    year_level = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All Years')] + Profile.YEAR_CHOICES,
+        widget=forms.Select(attrs={'class': 'filter-select'})
+    )
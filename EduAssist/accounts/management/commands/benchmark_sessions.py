@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.auth_cache import invalidate_user
+
+User = get_user_model()
+
+CONFIGURATIONS = [
+    ("database sessions", "django.contrib.sessions.backends.db", 0),
+    ("cached_db + user cache", "django.contrib.sessions.backends.cached_db", 300),
+    ("signed cookies + user cache", "django.contrib.sessions.backends.signed_cookies", 300),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Request one authenticated page under each session configuration and "
+        "count the session and user queries issued before the view runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--path', default=None, help="Page to request (default: the notification inbox).")
+
+    def handle(self, *args, requests, path, **options):
+        path = path or reverse('notification_inbox')
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username="benchmark session user", email="bench@cit.edu")
+                for label, engine, user_cache in CONFIGURATIONS:
+                    self.run(label, engine, user_cache, user, path, requests)
+                raise _Rollback
+        except _Rollback:
+            invalidate_user(user.pk)
+            self.stdout.write("Benchmark user rolled back.")
+
+    def run(self, label, engine, user_cache, user, path, requests):
+        with override_settings(
+            SESSION_ENGINE=engine,
+            AUTH_USER_CACHE_TIMEOUT=user_cache,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            client = Client()
+            client.force_login(user)
+            client.get(path)  # warm the caches
+
+            auth_queries, timings = 0, []
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    client.get(path)
+                    timings.append(time.perf_counter() - started)
+                auth_queries += sum(
+                    1 for query in queries
+                    if 'django_session' in query['sql'] or 'FROM "auth_user"' in query['sql']
+                )
+
+        self.stdout.write(
+            f"{label:<30} {auth_queries / requests:.1f} session/user queries per request, "
+            f"median {statistics.median(timings) * 1000:.2f} ms"
+        )
@@ -0,0 +1,29 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .auth_cache import get_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware whose request.user and request.auser() are both
+    served by accounts.auth_cache, sharing one per-request result.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: self.cached_user(request))
+        request.auser = partial(self.acached_user, request)
+
+    @staticmethod
+    def cached_user(request):
+        if not hasattr(request, '_cached_user'):
+            request._cached_user = get_user(request)
+        return request._cached_user
+
+    @classmethod
+    async def acached_user(cls, request):
+        return await sync_to_async(cls.cached_user)(request)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Case-insensitive prefix search on auth_user.username for the user management
+# page. On PostgreSQL istartswith compiles to UPPER(username::text) LIKE ...,
+# which this expression index serves. (SQLite cannot index LIKE ... ESCAPE.)
+USERNAME_INDEX = 'accounts_auth_user_username_ci'
+
+
+def add_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {USERNAME_INDEX} ON auth_user (UPPER(username::text) text_pattern_ops)'
+        )
+
+
+def remove_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {USERNAME_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_profile_address_profile_bio_alter_profile_program_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['role', '-id'], name='profile_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['program', 'year_level', '-id'], name='profile_program_year_idx'),
+        ),
+        migrations.RunPython(add_username_index, remove_username_index),
+    ]
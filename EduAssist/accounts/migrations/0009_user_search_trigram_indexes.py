@@ -0,0 +1,40 @@
+from django.db import migrations, transaction
+
+# The user management search matches any word of the name and any part of
+# the program: UPPER(col::text) LIKE '%...%' on PostgreSQL, which trigram
+# GIN indexes serve. Skipped when pg_trgm cannot be installed (the search
+# still works, with a scan), and on other backends.
+INDEXES = [
+    ('accounts_auth_user_username_trgm', 'auth_user', 'UPPER(username::text)'),
+    ('accounts_profile_program_trgm', 'accounts_profile', 'UPPER(program::text)'),
+]
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except Exception as e:
+        print(f"pg_trgm unavailable, user search stays unindexed: {e}")
+        return
+    for name, table, expression in INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression} gin_trgm_ops)')
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for name, _table, _expression in INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_profile_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -63,9 +63,46 @@ class Profile(models.Model):
     bio = models.TextField(blank=True, null=True, help_text="Short bio about yourself")
     address = models.TextField(blank=True, null=True, help_text="Permanent address")
 
+    class Meta:
+        indexes = [
+            # User management filters, newest accounts first (keyset on -id)
+            models.Index(fields=['role', '-id'], name='profile_role_idx'),
+            models.Index(fields=['program', 'year_level', '-id'], name='profile_program_year_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    # --- Dirty-field tracking ---
+    # accounts.signals snapshots the loaded values on post_init; save() then
+    # writes only the columns that changed, and nothing at all when none did.
+    def remember_saved_values(self):
+        # Read from __dict__ so deferred fields are never fetched here
+        self._saved_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in self.__dict__
+        }
+
+    def dirty_fields(self):
+        saved = getattr(self, '_saved_values', {})
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (field.attname not in saved or saved[field.attname] != self.__dict__[field.attname])
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            dirty = self.dirty_fields()
+            if not dirty:
+                return
+            kwargs['update_fields'] = dirty
+        super().save(*args, **kwargs)
+        self.remember_saved_values()
+
     # --- Helper Properties ---
     @property
     def is_superadmin(self):
@@ -0,0 +1,20 @@
+from rest_framework.permissions import BasePermission
+
+from .roles import ADMIN_ROLES, get_role
+
+
+class HasRole(BasePermission):
+    """DRF permission on the role of request.user; subclasses set `roles`."""
+    roles = set()
+
+    def has_permission(self, request, view):
+        # Memoize on the underlying HttpRequest, shared with middleware and templates
+        return get_role(getattr(request, '_request', request)) in self.roles
+
+
+class IsAdminRole(HasRole):
+    roles = ADMIN_ROLES
+
+
+class IsSuperadminRole(HasRole):
+    roles = {'SUPERADMIN'}
@@ -0,0 +1,41 @@
+import re
+
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+
+REQUIRED_DOMAIN = "@cit.edu"
+NAME_PATTERN = re.compile(r'^[a-zA-Z\s]+$')
+# Combined regex pattern for mandatory complexity requirements
+COMPLEXITY_PATTERN = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*[!@#$%^&*()_+=-]).{8,}$')
+
+
+def registration_error(username, email, password, password2):
+    """
+    The registration rules shared by register_view and import_students.
+    Returns (template_field, message) for the first rule that fails, or None.
+    Checking that the username is free is left to the caller.
+    """
+    if not NAME_PATTERN.match(username or ''):
+        return 'username_error', "Full Name can only contain letters and spaces."
+
+    if not (email or '').endswith(REQUIRED_DOMAIN):
+        return 'email_error', f"Please use your educational email ending in {REQUIRED_DOMAIN}."
+
+    if password != password2:
+        return 'password2_error', "Passwords do not match."
+
+    if not COMPLEXITY_PATTERN.match(password or ''):
+        return 'password_error', (
+            "Password must be at least 8 characters and include an uppercase letter, "
+            "a lowercase letter, and a special character (!@#$%^&*()_+=-)."
+        )
+
+    try:
+        # Run all password validators from settings.py
+        # We create a temporary user object because some validators check user attributes (like username similarity)
+        validate_password(password, user=User(username=username))
+    except ValidationError as e:
+        return 'password_error', e.messages[0]
+
+    return None
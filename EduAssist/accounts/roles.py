@@ -0,0 +1,54 @@
+"""
+Role lookups for permission checks.
+
+The role comes from the Profile that accounts.backends loads with the
+session user (and that accounts.auth_cache keeps with a cached user), so an
+authenticated request needs no role query at all. get_role() also memoizes
+the answer on the request, so views, templates and DRF permissions share it.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Profile
+
+ADMIN_ROLES = {'ADMIN', 'SUPERADMIN'}
+ROLES = {value for value, _label in Profile.ROLE_CHOICES}
+
+
+def role_for_user(user):
+    """The user's role, or None for anonymous users."""
+    if not user or not user.is_authenticated:
+        return None
+    if User.profile.related.is_cached(user):
+        profile = User.profile.related.get_cached_value(user)
+        return profile.role if profile is not None else 'STUDENT'
+    # A user loaded some other way (e.g. RequestFactory, a shell): one query
+    return Profile.objects.filter(user_id=user.pk).values_list('role', flat=True).first() or 'STUDENT'
+
+
+def get_role(request):
+    """Role of request.user, looked up at most once per request."""
+    if not hasattr(request, '_user_role'):
+        request._user_role = role_for_user(getattr(request, 'user', None))
+    return request._user_role
+
+
+def is_admin_role(role):
+    return role in ADMIN_ROLES
+
+
+def set_role(profile, role):
+    """
+    Change a profile's role and keep the user's is_staff flag (Django admin
+    and the staff-only views) in line with it.
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown role: {role}")
+    with transaction.atomic():
+        profile.role = role
+        profile.save()
+        user = profile.user
+        is_staff = is_admin_role(role)
+        if user.is_staff != is_staff:
+            user.is_staff = is_staff
+            user.save(update_fields=["is_staff"])
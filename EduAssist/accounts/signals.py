@@ -1,8 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from .auth_cache import invalidate_user
 from .models import Profile
 
+@receiver(post_init, sender=Profile)
+def remember_profile_values(sender, instance, **kwargs):
+    instance.remember_saved_values()
+
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
     if created:
@@ -16,5 +21,21 @@ def create_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_profile(sender, instance, **kwargs):
-    if hasattr(instance, "profile"):
+    # Only a profile already loaded on this user can carry edits; checking the
+    # cache instead of hasattr() avoids a SELECT on every login. Profile.save()
+    # is itself a no-op unless a field changed.
+    if User.profile.related.is_cached(instance):
         instance.profile.save()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_cached_profile(sender, instance, **kwargs):
+    # A cached user carries its profile (for the role), so drop it with the profile
+    invalidate_user(instance.user_id)
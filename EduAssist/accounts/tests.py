@@ -1,3 +1,381 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request as DRFRequest
+
+from .auth_cache import get_user as get_cached_user
+from .middleware import CachedAuthenticationMiddleware
+from .models import Profile
+from .permissions import IsAdminRole, IsSuperadminRole
+from .roles import get_role
+from .views import USERS_PAGE_SIZE, role_counts, user_management_queryset
+
+
+class ProfileWriteTests(TestCase):
+    """Saving a User only touches its Profile when a profile field actually changed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'Secret-pass1')
+        cls.superadmin = User.objects.create_user('boss', 'boss@cit.edu', 'x')
+        Profile.objects.filter(user=cls.superadmin).update(role='SUPERADMIN')
+
+    def profile_queries(self, queries):
+        return [query['sql'] for query in queries if 'accounts_profile' in query['sql']]
+
+    def test_login_does_not_touch_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'username': 'student', 'password': 'Secret-pass1'})
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.profile_queries(queries), [])
+
+    def test_register_writes_profile_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('register'), {
+                'username': 'New Student', 'email': 'new@cit.edu',
+                'password': 'Another-pass1', 'password2': 'Another-pass1',
+            })
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        profile_sql = self.profile_queries(queries)
+        self.assertEqual(len(profile_sql), 1)
+        self.assertTrue(profile_sql[0].startswith('INSERT'))
+        self.assertFalse([sql for sql in (q['sql'] for q in queries) if sql.startswith('UPDATE "auth_user"')])
+
+    def test_role_change_updates_only_role(self):
+        self.client.force_login(self.superadmin)
+        target = self.student.profile
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('change_role', args=[target.id]), {'role': 'ADMIN'})
+
+        updates = [sql for sql in self.profile_queries(queries) if sql.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"role"', updates[0])
+        self.assertNotIn('"contact"', updates[0])
+        target.refresh_from_db()
+        self.assertEqual(target.role, 'ADMIN')
+        self.assertTrue(User.objects.get(id=self.student.id).is_staff)
+
+    def test_unchanged_profile_save_is_skipped(self):
+        profile = Profile.objects.get(user=self.student)
+        with self.assertNumQueries(0):
+            profile.save()
+        profile.contact = '0917'
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"role"', queries[0]['sql'])
+
+
+class UserManagementTests(TestCase):
+    """admin_dashboard filters and pages in SQL instead of rendering every profile."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = User.objects.create_user('Boss Person', 'boss@cit.edu', 'x', is_staff=True)
+        Profile.objects.filter(user=cls.superadmin).update(role='SUPERADMIN')
+        User.objects.bulk_create([User(username=f"Student {i:03}", email=f"s{i}@cit.edu") for i in range(120)])
+        Profile.objects.bulk_create([
+            Profile(user=user, role='STUDENT', contact='', program='BS Computer Science', year_level=str(user.id % 4 + 1))
+            for user in User.objects.filter(username__startswith='Student')
+        ])
+        Profile.objects.filter(user__username='Student 007').update(role='ADMIN')
+
+    def setUp(self):
+        self.client.force_login(self.superadmin)
+
+    def test_pages_through_all_users(self):
+        base = reverse('admin_dashboard')
+        seen, url = [], base
+        while url:
+            response = self.client.get(url)
+            users = response.context['users']
+            self.assertLessEqual(len(users), USERS_PAGE_SIZE)
+            seen += [profile.id for profile in users]
+            url = response.context['next_cursor'] and f"{base}?{response.context['next_query']}"
+        self.assertEqual(seen, list(Profile.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_filters_and_search_run_in_sql(self):
+        response = self.client.get(reverse('admin_dashboard'), {'role': 'ADMIN'})
+        self.assertEqual([p.user.username for p in response.context['users']], ['Student 007'])
+
+        response = self.client.get(reverse('admin_dashboard'), {'search': 'student 01', 'year_level': '2'})
+        expected = Profile.objects.filter(user__username__startswith='Student 01', year_level='2').count()
+        self.assertEqual(len(response.context['users']), expected)
+        self.assertTrue(expected)
+
+    def search(self, term):
+        response = self.client.get(reverse('admin_dashboard'), {'search': term})
+        return [profile.user.username for profile in response.context['users']]
+
+    def test_search_matches_surname_and_program(self):
+        Profile.objects.filter(user=self.superadmin).update(program='BS Information Technology')
+        search = self.search
+        self.assertEqual(search('person'), ['Boss Person'])
+        self.assertEqual(search('PERS'), ['Boss Person'])
+        self.assertEqual(search('information'), ['Boss Person'])
+        # Word starts only: "oss" is inside "Boss" but starts no word
+        self.assertEqual(search('oss'), [])
+        self.assertEqual(len(search('computer science')), USERS_PAGE_SIZE)
+
+    def test_role_counts_single_query(self):
+        with self.assertNumQueries(1):
+            counts = role_counts()
+        self.assertEqual(counts, {'total': 121, 'superadmin': 1, 'admin': 1, 'student': 119})
+
+    def test_filters_use_indexes(self):
+        def plan(**params):
+            request = RequestFactory().get('/', params)
+            queryset, _form = user_management_queryset(request)
+            return queryset.order_by('-id')[:USERS_PAGE_SIZE + 1].explain()
+
+        self.assertIn('profile_role_idx', plan(role='ADMIN'))
+        self.assertIn('profile_program_year_idx', plan(program='BS Computer Science', year_level='2'))
+        if connection.vendor == 'postgresql':
+            names = User.objects.filter(username__istartswith='stud').values('id')
+            self.assertIn('accounts_auth_user_username_ci', names.explain())
+
+
+class ImportStudentsTests(TestCase):
+    """import_students applies the registration rules and creates users and profiles in bulk."""
+
+    CSV = (
+        "username,email,password,program,year_level\n"
+        "Ana Cruz,ana@cit.edu,Strong-pass1,BS Computer Science,1\n"
+        "Ben Reyes,ben@cit.edu,Strong-pass2,,\n"
+        "Cara Lim,cara@gmail.com,Strong-pass3,,\n"
+        "Existing One,dup@cit.edu,Strong-pass4,,\n"
+        "Ana Cruz,ana2@cit.edu,Strong-pass5,,\n"
+        "Dan Uy,dan@cit.edu,weak,,\n"
+        "Eve Tan,eve@cit.edu,Strong-pass6,BS Underwater Basket Weaving,2\n"
+    )
+
+    def setUp(self):
+        User.objects.create_user('Existing One', 'existing@cit.edu', 'x')
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        handle.write(self.CSV)
+        handle.close()
+        self.path = handle.name
+        self.addCleanup(os.remove, self.path)
+
+    def run_import(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_students', self.path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_valid_rows_and_reports_the_rest(self):
+        with CaptureQueriesContext(connection) as queries:
+            out, err = self.run_import('--workers=2')
+
+        self.assertIn("Created 2 student account(s)", out)
+        self.assertIn("rows/s", out)
+        self.assertEqual(err.count("line "), 5)
+        self.assertIn("line 4: Please use your educational email", err)
+        self.assertIn("line 5: Username already exists.", err)
+        self.assertIn("line 6: Duplicate username", err)
+        self.assertIn("line 8: Unknown program", err)
+
+        ana = User.objects.get(username='Ana Cruz')
+        self.assertTrue(ana.check_password('Strong-pass1'))
+        self.assertEqual((ana.profile.role, ana.profile.program, ana.profile.year_level),
+                         ('STUDENT', 'BS Computer Science', '1'))
+        self.assertTrue(User.objects.get(username='Ben Reyes').check_password('Strong-pass2'))
+        # No per-row round trips: one lookup, one INSERT per table (plus the transaction)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+
+    def test_overlong_contact_is_rejected(self):
+        with open(self.path, 'w') as handle:
+            handle.write(
+                "username,email,password,contact\n"
+                "Ana Cruz,ana@cit.edu,Strong-pass1,09171234567\n"
+                "Ben Reyes,ben@cit.edu,Strong-pass2,+63 917 123 4567 ext 9\n"
+            )
+        out, err = self.run_import('--workers=1')
+        self.assertIn("line 3: Contact must be at most 15 characters.", err)
+        self.assertIn("Created 1 student account(s)", out)
+        self.assertEqual(User.objects.get(username='Ana Cruz').profile.contact, '09171234567')
+
+    def test_failed_chunk_rolls_back_the_whole_import(self):
+        original = Profile.objects.bulk_create
+        calls = []
+
+        def fail_second_chunk(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise IntegrityError("simulated failure")
+            return original(objs, *args, **kwargs)
+
+        with mock.patch.object(Profile.objects, 'bulk_create', side_effect=fail_second_chunk):
+            with self.assertRaises(IntegrityError):
+                self.run_import('--workers=1', '--batch-size=1')
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Profile.objects.count(), 1)
+
+    def test_dry_run_creates_nothing(self):
+        out, _err = self.run_import('--dry-run', '--workers=1')
+        self.assertIn("2 valid row(s), 5 rejected.", out)
+        self.assertEqual(User.objects.count(), 1)
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', AUTH_USER_CACHE_TIMEOUT=300)
+class CachedSessionUserTests(TestCase):
+    """With cached sessions and the user cache, an authenticated request needs no session or user query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student', 'student@cit.edu', 'Secret-pass1')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.get(reverse('notification_inbox'))
+
+    def auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('notification_inbox'))
+        sql = [q['sql'] for q in queries if 'django_session' in q['sql'] or 'FROM "auth_user"' in q['sql']]
+        return response, sql
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        response, sql = self.auth_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(sql, [])
+
+    def test_password_change_ends_cached_sessions(self):
+        user = User.objects.get(id=self.user.id)
+        user.set_password('Changed-pass1')
+        user.save()
+        response, _sql = self.auth_queries()
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions_log_out(self):
+        # SessionMiddleware picks its engine when the client's handler loads
+        self.client = self.client_class()
+        self.client.force_login(self.user)
+        self.client.get(reverse('notification_inbox'))
+        response, sql = self.auth_queries()
+        self.assertEqual((response.status_code, sql), (200, []))
+        self.client.get(reverse('logout'))
+        self.assertEqual(self.client.get(reverse('notification_inbox')).status_code, 302)
+
+    def test_async_user_shares_the_cached_lookup(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        CachedAuthenticationMiddleware(lambda request: None).process_request(request)
+
+        with mock.patch('accounts.middleware.get_user', wraps=get_cached_user) as lookup:
+            async_user = async_to_sync(request.auser)()
+            self.assertEqual(async_user, self.user)
+            self.assertIs(async_to_sync(request.auser)(), async_user)
+            self.assertEqual(request.user.pk, async_user.pk)
+            self.assertIs(request._cached_user, async_user)
+        self.assertEqual(lookup.call_count, 1)
+
+
+class RoleResolverTests(TestCase):
+    """The role is loaded with the session user, memoized per request, and never served stale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = User.objects.create_user('boss', 'boss@cit.edu', 'x', is_staff=True)
+        Profile.objects.filter(user=cls.superadmin).update(role='SUPERADMIN')
+        cls.admin = User.objects.create_user('admin', 'admin@cit.edu', 'x', is_staff=True)
+        Profile.objects.filter(user=cls.admin).update(role='ADMIN')
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+
+    def setUp(self):
+        cache.clear()
+
+    def role_queries(self, queries):
+        return [q['sql'] for q in queries if 'FROM "accounts_profile" WHERE "accounts_profile"."user_id" =' in q['sql']]
+
+    def make_request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_role_is_loaded_with_the_session_user(self):
+        self.client.force_login(self.superadmin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_dashboard'))
+        self.assertContains(response, 'changeRoleBtn')
+        user_queries = [q['sql'] for q in queries if 'FROM "auth_user"' in q['sql'] and 'LEFT OUTER JOIN "accounts_profile"' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertEqual(self.role_queries(queries), [])
+
+    def test_role_memoized_per_request(self):
+        request = self.make_request(User.objects.get(id=self.superadmin.id))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role(request), 'SUPERADMIN')
+            self.assertEqual(get_role(request), 'SUPERADMIN')
+            self.assertTrue(IsAdminRole().has_permission(DRFRequest(request), None))
+
+    def test_drf_permission_shares_the_request_memo(self):
+        request = self.make_request(User.objects.get(id=self.superadmin.id))
+        with self.assertNumQueries(1):
+            self.assertTrue(IsSuperadminRole().has_permission(DRFRequest(request), None))
+            self.assertEqual(get_role(request), 'SUPERADMIN')
+        self.assertFalse(IsAdminRole().has_permission(self.make_request(self.student), None))
+
+    def test_role_change_refreshes_role_and_staff_flag(self):
+        self.assertEqual(get_role(self.make_request(self.student)), 'STUDENT')
+        self.client.force_login(self.superadmin)
+        self.client.post(reverse('change_role', args=[self.student.profile.id]), {'role': 'ADMIN'})
+
+        student = User.objects.get(id=self.student.id)
+        self.assertEqual(get_role(self.make_request(student)), 'ADMIN')
+        self.assertTrue(student.is_staff)
+
+        self.client.post(reverse('change_role', args=[self.student.profile.id]), {'role': 'OWNER'})
+        self.assertEqual(Profile.objects.get(user=self.student).role, 'ADMIN')
+
+    def test_demotion_applies_to_the_next_request(self):
+        self.client.force_login(self.admin)
+        target = self.student.profile
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+
+        # Bypasses the signals, as a change made through another worker would
+        Profile.objects.filter(user=self.admin).update(role='STUDENT')
+
+        response = self.client.post(reverse('delete_user', args=[target.id]))
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(User.objects.filter(id=self.student.id).exists())
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=300)
+    def test_cached_user_carries_its_role_until_the_profile_changes(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse('admin_dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+        self.assertEqual(self.role_queries(queries), [])
+        self.assertFalse([q for q in queries if 'FROM "auth_user"' in q['sql']])
+
+        profile = Profile.objects.get(user=self.admin)
+        profile.role = 'STUDENT'
+        profile.save()
+        response = self.client.post(reverse('delete_user', args=[self.student.profile.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_sessions_from_the_stock_backend_stay_signed_in(self):
+        self.client.force_login(self.admin)
+        session = self.client.session
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session.save()
+
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'accounts.backends.ProfileModelBackend')
@@ -7,14 +7,17 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
-from django.db.models import Q
+from django.db.models import Count, Q
 from .models import Profile
-from .forms import ProfileForm, SearchForm
+from .forms import ProfileForm, SearchForm, UserFilterForm
 from django.http import HttpResponseForbidden
 from feedback.models import Feedback
-import re
-from django.core.exceptions import ValidationError
-from django.contrib.auth.password_validation import validate_password
+from .registration import registration_error
+from .roles import get_role, is_admin_role, set_role
+from request_app.pagination import keyset_page
+
+USERS_PAGE_SIZE = 50
+USERS_ORDERING = ['-id']
 
 def login_view(request):
     # Initialize an empty dictionary for context
@@ -41,8 +44,8 @@ def login_view(request):
 
 
 def logout_view(request):
+    # logout() already flushes the session
     logout(request)
-    request.session.flush()
     return redirect('landing')
 
 
@@ -55,44 +58,16 @@ def register_view(request):
         password = request.POST.get('password')
         password2 = request.POST.get('password2')
         
-        required_domain = "@cit.edu"
-        
-        # Combined regex pattern for mandatory complexity requirements
-        complexity_pattern = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*[!@#$%^&*()_+=-]).{8,}$')
-
-        # --- VALIDATION CHAIN ---
-        if not re.match(r'^[a-zA-Z\s]+$', username):
-            context['username_error'] = "Full Name can only contain letters and spaces."
-        
-        elif not email.endswith(required_domain):
-            context['email_error'] = f"Please use your educational email ending in {required_domain}."
-            
-        elif password != password2:
-            context['password2_error'] = "Passwords do not match."
-            
-        # --- NEW PASSWORD VALIDATION INTEGRATION ---
-        elif not complexity_pattern.match(password):
-            context['password_error'] = "Password must be at least 8 characters and include an uppercase letter, a lowercase letter, and a special character (!@#$%^&*()_+=-)."
-            
+        error = registration_error(username, email, password, password2)
+        if error:
+            field, message = error
+            context[field] = message
+        elif User.objects.filter(username=username).exists():
+            context['username_error'] = "Username already exists."
         else:
-            try:
-                # 1. Run all password validators from settings.py
-                # We create a temporary user object because some validators check user attributes (like username similarity)
-                validate_password(password, user=User(username=username))
-                
-                # 2. If validation passes, check if username exists
-                if User.objects.filter(username=username).exists():
-                    context['username_error'] = "Username already exists."
-                else:
-                    # If all checks pass, create the user
-                    user = User.objects.create_user(username=username, email=email, password=password)
-                    user.save()
-                    return redirect('login')
-                    
-            except ValidationError as e:
-                # Catch errors from the common password check and other validators
-                context['password_error'] = e.messages[0]
-        # --- END NEW PASSWORD VALIDATION INTEGRATION ---
+            # If all checks pass, create the user
+            User.objects.create_user(username=username, email=email, password=password)
+            return redirect('login')
 
     return render(request, 'accounts/register.html', context)
 
@@ -175,39 +150,88 @@ def profile(request):
 
 @user_passes_test(lambda u: u.is_staff)
 def admin_dashboard(request):
-    profile = Profile.objects.get(user=request.user)
-
     # Only SUPERADMIN or ADMIN may view dashboard
-    if profile.role not in ["SUPERADMIN", "ADMIN"]:
+    if not is_admin_role(get_role(request)):
         return HttpResponseForbidden("Unauthorized access")
 
-    users = Profile.objects.select_related('user').all()
-    return render(request, 'Home/admin_dashboard.html', {'users': users})
+    users_qs, form = user_management_queryset(request)
+    users, next_cursor = keyset_page(
+        users_qs, USERS_ORDERING, cursor=request.GET.get('cursor'), page_size=USERS_PAGE_SIZE
+    )
+
+    # Filters stay on the "next page" link; only the cursor changes
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    first_query = params.urlencode()
+    if next_cursor:
+        params['cursor'] = next_cursor
+
+    return render(request, 'Home/admin_dashboard.html', {
+        'users': users,
+        'form': form,
+        'next_cursor': next_cursor,
+        'next_query': params.urlencode(),
+        'first_query': first_query,
+        'is_first_page': not request.GET.get('cursor'),
+        'role_counts': role_counts(),
+    })
+
+
+def user_management_queryset(request):
+    """
+    Profiles for the user management page with the role/program/year filters
+    and the name search applied in SQL; each filter has a matching index.
+    """
+    queryset = Profile.objects.select_related('user').only(
+        'id', 'role', 'program', 'year_level', 'contact', 'user__id', 'user__username'
+    )
+
+    form = UserFilterForm(request.GET or None)
+    if form.is_valid():
+        data = form.cleaned_data
+        if data['role']:
+            queryset = queryset.filter(role=data['role'])
+        if data['program']:
+            queryset = queryset.filter(program=data['program'])
+        if data['year_level']:
+            queryset = queryset.filter(year_level=data['year_level'])
+        search = data['search'].strip()
+        if search:
+            # Any word of the full name, or part of the program, as the old
+            # in-page filter allowed; trigram indexes serve these on PostgreSQL
+            # (accounts migration 0009)
+            queryset = queryset.filter(
+                Q(user__username__istartswith=search)
+                | Q(user__username__icontains=' ' + search)
+                | Q(program__icontains=search)
+            )
+
+    return queryset, form
+
+
+def role_counts():
+    """Accounts per role, all from one aggregate query."""
+    return Profile.objects.aggregate(
+        total=Count('id'),
+        **{role.lower(): Count('id', filter=Q(role=role)) for role, _label in Profile.ROLE_CHOICES}
+    )
 
 
 @login_required
 def change_role_view(request, user_id):
 
-    current = Profile.objects.get(user=request.user)
-
-    if current.role != "SUPERADMIN":
+    if get_role(request) != "SUPERADMIN":
         return HttpResponseForbidden("Only Superadmins can change roles.")
 
-    target = get_object_or_404(Profile, id=user_id)
-    target_user = target.user
+    target = get_object_or_404(Profile.objects.select_related('user'), id=user_id)
 
     if request.method == "POST":
-        new_role = request.POST.get("role")
-        target.role = new_role
-        target.save()
-
-        # IMPORTANT: Match Django permissions
-        if new_role in ["ADMIN", "SUPERADMIN"]:
-            target_user.is_staff = True
-        else:
-            target_user.is_staff = False
-        
-        target_user.save()
+        try:
+            # Also keeps is_staff (Django permissions) in line with the role
+            set_role(target, request.POST.get("role"))
+        except ValueError:
+            messages.error(request, "Unknown role.")
+            return redirect("admin_dashboard")
 
         messages.success(request, "Role updated successfully.")
         return redirect("admin_dashboard")
@@ -217,12 +241,12 @@ def change_role_view(request, user_id):
 @login_required
 def delete_user_view(request, user_id):
 
-    current = request.user.profile
-    target = get_object_or_404(Profile, id=user_id)
+    current_role = get_role(request)
+    target = get_object_or_404(Profile.objects.select_related('user'), id=user_id)
     target_user = target.user
 
     # Only ADMIN or SUPERADMIN may delete
-    if current.role not in ["ADMIN", "SUPERADMIN"]:
+    if not is_admin_role(current_role):
         return HttpResponseForbidden("You are not allowed to delete users.")
 
     # cant delete own account
@@ -231,13 +255,13 @@ def delete_user_view(request, user_id):
 
     # ADMIN restrictions:
     # -> Admin can ONLY delete STUDENTS
-    if current.role == "ADMIN":
+    if current_role == "ADMIN":
         if target.role != "STUDENT":
             return HttpResponseForbidden("Admins can only delete student accounts.")
 
     # SUPERADMIN restrictions:
     # -> Superadmin cannot delete other superadmins
-    if current.role == "SUPERADMIN" and target.role == "SUPERADMIN":
+    if current_role == "SUPERADMIN" and target.role == "SUPERADMIN":
         return HttpResponseForbidden("Superadmins cannot delete each other.")
 
     # Perform deletion
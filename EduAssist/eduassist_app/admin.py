@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import EmailLog, EmailOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('template_name', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'template_name')
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('created_at', 'sent_at')
+
+
+@admin.register(EmailLog)
+class EmailLogAdmin(admin.ModelAdmin):
+    list_display = ('type', 'to_email', 'status', 'created_at')
+    list_filter = ('status', 'type')
+    search_fields = ('to_email', 'message')
@@ -0,0 +1,172 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+# ------------------------
+# Backends
+# ------------------------
+class DatabaseLogBackend:
+    """Writes each batch to the local EmailLog table with one INSERT."""
+
+    def write(self, records):
+        from .models import EmailLog
+
+        close_old_connections()
+        EmailLog.objects.bulk_create([EmailLog(**record) for record in records])
+
+
+class SupabaseLogBackend:
+    """Writes each batch to the Supabase email_logs table in one request."""
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first flush, not at import, so startup never waits on Supabase
+        if self._client is None:
+            from supabase import create_client
+            self._client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        return self._client
+
+    def write(self, records):
+        rows = [{key: value for key, value in record.items() if key != "created_at"} for record in records]
+        self.client.table("email_logs").insert(rows).execute()
+
+
+# ------------------------
+# Buffered sink
+# ------------------------
+_WAKEUP = object()  # queued by close() so the flush thread notices the stop at once
+
+
+class BufferedLogSink:
+    """
+    Collects log records in a bounded in-memory queue and hands them to the
+    backend in batches from a background thread: when batch_size records are
+    waiting or flush_interval seconds have passed. emit() never blocks; when
+    the buffer is full new records are dropped and counted. Backend errors
+    are reported and the batch discarded, so an outage cannot back up senders.
+    """
+
+    def __init__(self, backend, batch_size=100, flush_interval=5.0, max_buffer=10000):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_buffer)
+        self.dropped = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def emit(self, record):
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        # Started lazily, and again in a forked worker process (threads don't survive fork)
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="email-log-sink", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stop.is_set():
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                if item is not _WAKEUP:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self._write(batch + self._drain())
+
+    def _drain(self):
+        records = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return records
+            if item is not _WAKEUP:
+                records.append(item)
+
+    def _write(self, records):
+        if not records:
+            return
+        with self._flush_lock:
+            for start in range(0, len(records), self.batch_size):
+                chunk = records[start:start + self.batch_size]
+                try:
+                    self.backend.write(chunk)
+                    self.written += len(chunk)
+                except Exception as e:
+                    print(f"Error logging email: {e}")
+
+    def flush(self):
+        """Write everything buffered so far from the calling thread."""
+        self._write(self._drain())
+
+    def close(self, timeout=5.0):
+        """Stop the background thread and write what is left (registered at exit)."""
+        self._stop.set()
+        try:
+            self.queue.put_nowait(_WAKEUP)
+        except queue.Full:
+            pass  # the thread is not waiting on an empty queue then
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = BufferedLogSink(
+                    import_string(settings.EMAIL_LOG_BACKEND)(),
+                    batch_size=settings.EMAIL_LOG_BATCH_SIZE,
+                    flush_interval=settings.EMAIL_LOG_FLUSH_INTERVAL,
+                    max_buffer=settings.EMAIL_LOG_MAX_BUFFER,
+                )
+                atexit.register(_sink.close)
+    return _sink
+
+
+def record(to_email, type, status, message=""):
+    get_sink().emit({
+        "to_email": to_email or "",
+        "type": type,
+        "status": status,
+        "message": message,
+        "created_at": timezone.now(),
+    })
@@ -0,0 +1,118 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import email_service
+from .email_service import EmailDeliveryError, build_notification_email
+from .models import EmailOutbox
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 30         # seconds before the first retry, doubled per attempt
+BACKOFF_MAX = 60 * 60     # cap a single wait at one hour
+LEASE_SECONDS = 5 * 60    # how long a claimed row stays locked to one worker
+
+
+def queue_notification_email(subject, to_email, template_name, context_data):
+    """
+    Record a notification email for the worker to send. Call it inside the
+    transaction that makes the change, so the email exists only if the
+    change commits and the HTTP request never waits on SMTP.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject,
+        to_email=to_email or "",
+        template_name=template_name,
+        context_data=context_data,
+        next_attempt_at=timezone.now(),
+    )
+
+
+def queue_notification_emails(emails):
+    """Bulk form of queue_notification_email: one INSERT for an iterable of its kwargs."""
+    now = timezone.now()
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            subject=email['subject'],
+            to_email=email['to_email'] or "",
+            template_name=email['template_name'],
+            context_data=email['context_data'],
+            next_attempt_at=now,
+        )
+        for email in emails
+    ], batch_size=500)
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter, in seconds."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(limit):
+    """
+    Lease up to `limit` due rows to this worker. Rows left in 'sending' by a
+    crashed worker are reclaimed once their lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            EmailOutbox.objects
+            .filter(Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lt=now))
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)
+        )
+        ids = list(due.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status='sending', locked_until=now + timedelta(seconds=LEASE_SECONDS)
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def deliver_batch(items, session, max_attempts=MAX_ATTEMPTS):
+    """
+    Send claimed rows over one MailSession and record each outcome; rows that
+    went out are marked sent with a single UPDATE. Returns the new statuses.
+    """
+    statuses, ready, messages = [], [], []
+    for item in items:
+        try:
+            messages.append(build_notification_email(item.subject, item.to_email, item.template_name, item.context_data))
+            ready.append(item)
+        except EmailDeliveryError as e:
+            statuses.append(record_failure(item, str(e), permanent=e.permanent, max_attempts=max_attempts))
+
+    sent_ids = []
+    for item, error in zip(ready, session.send_messages(messages)):
+        if error is None:
+            email_service.log_email(item.to_email, item.template_name, "Sent")
+            sent_ids.append(item.id)
+        else:
+            email_service.log_email(item.to_email, item.template_name, "Failed - Service Error", str(error))
+            statuses.append(record_failure(item, str(error), max_attempts=max_attempts))
+
+    if sent_ids:
+        EmailOutbox.objects.filter(id__in=sent_ids).update(
+            status='sent', attempts=F('attempts') + 1, sent_at=timezone.now(), locked_until=None, last_error=''
+        )
+        statuses.extend(['sent'] * len(sent_ids))
+    return statuses
+
+
+def record_failure(item, error, permanent=False, max_attempts=MAX_ATTEMPTS):
+    attempts = item.attempts + 1
+    if permanent or attempts >= max_attempts:
+        # Dead letter: kept for inspection, never retried automatically
+        status, next_attempt_at = 'dead', timezone.now()
+    else:
+        status = 'pending'
+        next_attempt_at = timezone.now() + timedelta(seconds=backoff_delay(attempts))
+
+    EmailOutbox.objects.filter(id=item.id).update(
+        status=status, attempts=attempts, next_attempt_at=next_attempt_at, locked_until=None, last_error=error
+    )
+    return status
@@ -1,57 +1,179 @@
 import re
-from django.core.mail import EmailMultiAlternatives
-from django.template import Template, Context
+import smtplib
+import time
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
-from supabase import create_client
-from .email_templates import load_template
+from . import email_log
+from .email_templates import get_compiled_template
+
+
+class EmailDeliveryError(Exception):
+    """A notification email could not be sent. Permanent errors are not worth retrying."""
+
+    def __init__(self, status, detail="", permanent=False):
+        super().__init__(f"{status}: {detail}" if detail else status)
+        self.status = status
+        self.detail = detail
+        self.permanent = permanent
 
-supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 def is_valid_email(email):
     return re.match(r"[^@]+@[^@]+\.[^@]+", email)
 
 def log_email(to_email, type, status, message=""):
-    supabase.table("email_logs").insert({
-        "to_email": to_email,
-        "type": type,
-        "status": status,
-        "message": message
-    }).execute()
+    # Buffered and written in batches off the request path (see email_log);
+    # an audit log outage must never turn a delivered email into a failure.
+    try:
+        email_log.record(to_email, type, status, message)
+    except Exception as e:
+        print(f"Error logging email: {e}")
 
-def send_notification_email(subject, to_email, template_name, context_data):
+def build_notification_email(subject, to_email, template_name, context_data, connection=None):
+    """Validate and render one notification email; raises a permanent EmailDeliveryError if it can't be built."""
     # 1. Validate email
-    if not is_valid_email(to_email):
+    if not is_valid_email(to_email or ""):
         log_email(to_email, template_name, "Failed - Invalid Email")
-        return False
+        raise EmailDeliveryError("Failed - Invalid Email", permanent=True)
 
-    # 2. Load template
-    template_html = load_template(template_name)
-    if template_html is None:
+    # 2. Load template (compiled once per file version)
+    try:
+        template = get_compiled_template(template_name)
+    except Exception as e:
+        log_email(to_email, template_name, "Failed - Template Render Error", str(e))
+        raise EmailDeliveryError("Failed - Template Render Error", str(e), permanent=True)
+    if template is None:
         log_email(to_email, template_name, "Failed - Template Missing")
-        return False
+        raise EmailDeliveryError("Failed - Template Missing", permanent=True)
 
     # 3. Render template
     try:
-        template = Template(template_html)
-        rendered_html = template.render(Context(context_data))
+        rendered_html, rendered_text = template.render(context_data)
     except Exception as e:
         log_email(to_email, template_name, "Failed - Template Render Error", str(e))
-        return False
+        raise EmailDeliveryError("Failed - Template Render Error", str(e), permanent=True)
+
+    email = EmailMultiAlternatives(
+        subject,
+        rendered_text,
+        settings.DEFAULT_FROM_EMAIL,
+        [to_email],
+        connection=connection,
+    )
+    email.attach_alternative(rendered_html, "text/html")
+    return email
+
+def deliver_notification_email(subject, to_email, template_name, context_data, connection=None):
+    """Render and send one notification email; raises EmailDeliveryError on failure."""
+    email = build_notification_email(subject, to_email, template_name, context_data, connection)
 
     # 4. Send email
     try:
-        email = EmailMultiAlternatives(
-            subject,
-            "",  # plain text
-            settings.DEFAULT_FROM_EMAIL,
-            [to_email]
-        )
-        email.attach_alternative(rendered_html, "text/html")
         email.send()
-
-        log_email(to_email, template_name, "Sent")
-        return True
-
     except Exception as e:
         log_email(to_email, template_name, "Failed - Service Error", str(e))
+        raise EmailDeliveryError("Failed - Service Error", str(e))
+
+    log_email(to_email, template_name, "Sent")
+
+def send_notification_email(subject, to_email, template_name, context_data):
+    try:
+        deliver_notification_email(subject, to_email, template_name, context_data)
+        return True
+    except EmailDeliveryError:
         return False
+
+
+class MailSession:
+    """
+    One long-lived, authenticated connection to the mail backend, reused for
+    every message a worker sends instead of a TLS handshake and login per
+    email. The connection is re-opened when the server has dropped it or it
+    sat idle past IDLE_TIMEOUT and no longer answers NOOP.
+    Keyword arguments go to django.core.mail.get_connection().
+    """
+    IDLE_TIMEOUT = 60  # seconds; relays such as Gmail close idle sessions
+    RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+    def __init__(self, **connection_kwargs):
+        self.connection_kwargs = connection_kwargs
+        self.connection = None
+        self.last_used = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.reconnects = 0
+        self.send_seconds = 0.0
+
+    def open(self):
+        if self.connection is not None and time.monotonic() - self.last_used > self.IDLE_TIMEOUT:
+            if not self._alive():
+                self.close()
+                self.reconnects += 1
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False, **self.connection_kwargs)
+            self.connection.open()
+            self.last_used = time.monotonic()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def _alive(self):
+        smtp = getattr(self.connection, "connection", None)
+        if smtp is None:
+            # Not an SMTP backend, or closed: send_messages opens it again itself
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def send_messages(self, messages):
+        """
+        Send a batch over the shared connection. Returns one entry per message:
+        None when it was accepted, otherwise the exception it failed with.
+        """
+        started = time.monotonic()
+        results = [self._send(message) for message in messages]
+        self.send_seconds += time.monotonic() - started
+        return results
+
+    def _send(self, message):
+        # Messages go one per send_messages() call so a rejected recipient
+        # fails only its own message; the connection stays open between them.
+        for attempt in (1, 2):
+            try:
+                self.open()
+                self.connection.send_messages([message])
+                self.last_used = time.monotonic()
+                self.sent += 1
+                return None
+            except self.RECONNECT_ERRORS as e:
+                self.close()
+                if attempt == 2:
+                    self.failed += 1
+                    return e
+                self.reconnects += 1
+            except Exception as e:
+                self.failed += 1
+                return e
+
+    def throughput(self):
+        """Counters for reporting; rate is messages sent per second of send time."""
+        rate = self.sent / self.send_seconds if self.send_seconds else 0.0
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "reconnects": self.reconnects,
+            "seconds": round(self.send_seconds, 3),
+            "per_second": round(rate, 1),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
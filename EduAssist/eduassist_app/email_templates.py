@@ -1,11 +1,89 @@
+import html
 import os
+import re
+import threading
+
 from django.conf import settings
+from django.template import Context, Template
+from django.utils.html import strip_tags
+
+
+def template_path(template_name):
+    directory = getattr(settings, "EMAIL_TEMPLATES_DIR", os.path.join(settings.BASE_DIR, "email_templates"))
+    return os.path.join(directory, f"{template_name}.html")
+
 
 def load_template(template_name):
-    path = os.path.join(settings.BASE_DIR, "email_templates", f"{template_name}.html")
+    path = template_path(template_name)
 
     if not os.path.exists(path):
         return None
 
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
+
+
+def html_to_text_source(source):
+    """
+    Derive a plain-text template from an HTML email template: markup removed,
+    block ends turned into line breaks, template tags and variables kept.
+    Autoescaping is off because the result is not HTML.
+    """
+    text = re.sub(r"(?is)<(head|style|script)\b.*?</\1>", "", source)
+    text = re.sub(r"(?i)<br\s*/?>[ \t]*\n?", "\n", text)
+    text = re.sub(r"(?i)</(p|div|h[1-6]|li|tr|blockquote|table)>", "\n\n", text)
+    text = html.unescape(strip_tags(text))
+    text = "\n".join(line.strip() for line in text.splitlines())
+    return "{% autoescape off %}" + text.strip() + "{% endautoescape %}"
+
+
+class CompiledEmailTemplate:
+    """The parsed HTML template and its plain-text counterpart for one file version."""
+
+    def __init__(self, version, source):
+        self.version = version
+        self.html = Template(source)
+        self.text = Template(html_to_text_source(source))
+
+    def render(self, context_data):
+        """Returns (html, text) for one email."""
+        rendered_html = self.html.render(Context(context_data))
+        rendered_text = self.text.render(Context(context_data))
+        # Blank lines left behind by {% if %} blocks
+        rendered_text = re.sub(r"\n{3,}", "\n\n", rendered_text).strip()
+        return rendered_html, rendered_text
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_template(template_name):
+    """
+    Compiled template for a name from the email template directory, or None
+    if the file does not exist. Parsed once and reused until the file's
+    mtime or size changes, so a send costs one stat() plus the render.
+    """
+    path = template_path(template_name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _compiled.pop(path, None)
+        return None
+
+    version = (stat.st_mtime_ns, stat.st_size)
+    compiled = _compiled.get(path)
+    if compiled is not None and compiled.version == version:
+        return compiled
+
+    with _compiled_lock:
+        compiled = _compiled.get(path)
+        if compiled is None or compiled.version != version:
+            with open(path, "r", encoding="utf-8") as f:
+                compiled = CompiledEmailTemplate(version, f.read())
+            _compiled[path] = compiled
+    return compiled
+
+
+def clear_template_cache():
+    _compiled.clear()
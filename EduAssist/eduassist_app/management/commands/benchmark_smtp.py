@@ -0,0 +1,63 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from eduassist_app.email_service import MailSession, build_notification_email
+from eduassist_app.smtp_standin import LocalSMTPServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Send notification emails to an in-process SMTP stand-in and compare a new "
+        "connection per message with one pooled MailSession sending in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--connect-latency', type=float, default=0.05,
+            help="Simulated seconds per new connection (TCP + STARTTLS + AUTH to a real relay).",
+        )
+        parser.add_argument(
+            '--drop-after', type=int, default=None,
+            help="Have the stand-in close each connection after this many messages.",
+        )
+
+    def handle(self, *args, messages, batch_size, connect_latency, drop_after, **options):
+        emails = [
+            build_notification_email(
+                f"Your Request 'Benchmark {i}' Has Been Approved",
+                f"student{i}@cit.edu",
+                "request_approved",
+                {"name": "Student", "title": f"Benchmark {i}", "admin_message": "", "new_status": "Approved"},
+            )
+            for i in range(messages)
+        ]
+
+        with LocalSMTPServer(connect_latency=connect_latency, drop_after=drop_after) as smtp:
+            kwargs = smtp.connection_kwargs
+
+            started = time.perf_counter()
+            for email in emails:
+                # Previous behaviour: email.send() opens and closes its own connection
+                email.connection = get_connection(**kwargs)
+                email.send()
+            self.report("per-message connections", messages, time.perf_counter() - started, smtp.connections)
+
+            baseline = smtp.connections
+            started = time.perf_counter()
+            with MailSession(**kwargs) as session:
+                for i in range(0, len(emails), batch_size):
+                    session.send_messages(emails[i:i + batch_size])
+            self.report(
+                "pooled MailSession", messages, time.perf_counter() - started, smtp.connections - baseline,
+                extra=f", {session.reconnects} reconnect(s), {session.failed} failed",
+            )
+            self.stdout.write(f"Stand-in received {len(smtp.messages)} message(s).")
+
+    def report(self, label, count, seconds, connections, extra=""):
+        self.stdout.write(
+            f"{label:<24} {seconds:7.3f}s  {count / seconds:8.1f} msg/s  {connections} connection(s){extra}"
+        )
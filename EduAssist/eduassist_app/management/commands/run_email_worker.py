@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from eduassist_app.email_outbox import MAX_ATTEMPTS, claim_batch, deliver_batch
+from eduassist_app.email_service import MailSession
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the outbox, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Parallel senders, one SMTP connection each.")
+        parser.add_argument('--batch-size', type=int, default=50, help="Rows claimed per poll.")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help="Attempts before a row is dead-lettered.")
+        parser.add_argument('--once', action='store_true', help="Drain the currently due rows and exit.")
+
+    def handle(self, *args, concurrency, batch_size, poll_interval, max_attempts, once, **options):
+        # Each sender thread keeps its own long-lived SMTP session across batches
+        local = threading.local()
+        sessions = []
+
+        def session():
+            if not hasattr(local, 'session'):
+                local.session = MailSession()
+                sessions.append(local.session)
+            return local.session
+
+        def send_chunk(items):
+            try:
+                return deliver_batch(items, session(), max_attempts=max_attempts)
+            finally:
+                # Worker threads get their own DB connection; don't leak it
+                connection.close()
+
+        totals = {}
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                while True:
+                    close_old_connections()
+                    batch = claim_batch(batch_size)
+
+                    if concurrency > 1:
+                        # One slice of the batch per sender
+                        chunks = [batch[i::concurrency] for i in range(concurrency) if batch[i::concurrency]]
+                        results = [status for statuses in pool.map(send_chunk, chunks) for status in statuses]
+                    else:
+                        # --concurrency 1 sends on the main thread (and its DB connection)
+                        results = deliver_batch(batch, session(), max_attempts=max_attempts) if batch else []
+
+                    for status in results:
+                        totals[status] = totals.get(status, 0) + 1
+
+                    if not batch:
+                        if once:
+                            break
+                        time.sleep(poll_interval)
+        finally:
+            for mail_session in sessions:
+                mail_session.close()
+
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(totals.items())) or "nothing due"
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {summary}."))
+
+        sent = sum(s.sent for s in sessions)
+        seconds = max((s.send_seconds for s in sessions), default=0)
+        if sent:
+            self.stdout.write(
+                f"SMTP: {sent} sent over {len(sessions)} connection(s), "
+                f"{sum(s.reconnects for s in sessions)} reconnect(s), ~{sent / seconds if seconds else 0:.1f} msg/s"
+            )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduassist_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.CharField(blank=True, max_length=254)),
+                ('type', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=100)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
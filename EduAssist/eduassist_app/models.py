@@ -0,0 +1,58 @@
+from django.db import models
+from django.utils import timezone
+
+
+# ------------------------
+# Email Outbox Model
+# ------------------------
+class EmailOutbox(models.Model):
+    """
+    Notification email waiting to be delivered. Rows are written in the same
+    transaction as the change that triggers them and drained by
+    `manage.py run_email_worker`.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    to_email = models.CharField(max_length=254)
+    template_name = models.CharField(max_length=100)
+    context_data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    # A 'sending' row whose lease expired belongs to a crashed worker and is retried
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker poll: due rows only, oldest first
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='pending'), name='outbox_due_idx'),
+            models.Index(fields=['locked_until'], condition=models.Q(status='sending'), name='outbox_leased_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.template_name} to {self.to_email} ({self.get_status_display()})"
+
+
+# ------------------------
+# Email Log Model
+# ------------------------
+class EmailLog(models.Model):
+    """Local copy of the email audit log, written by email_log.DatabaseLogBackend."""
+    to_email = models.CharField(max_length=254, blank=True)
+    type = models.CharField(max_length=100)
+    status = models.CharField(max_length=100)
+    message = models.TextField(blank=True)
+    # When the event happened, not when the buffered batch was written
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.type} to {self.to_email}: {self.status}"
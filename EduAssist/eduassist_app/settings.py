@@ -56,7 +56,7 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'settings.middleware.ThemeMiddleware',
@@ -76,6 +76,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'settings.context_processors.theme_settings',
+                'accounts.context_processors.user_role',
                 'request_app.context_processors.user_notifications',
             ],
         },
@@ -99,6 +100,38 @@ DATABASES = {
     )
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (Redis, Memcached, database) when running several workers so
+# cache invalidation reaches all of them.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "eduassist"),
+    }
+}
+
+# Sessions
+# The default database backend costs a django_session SELECT per request.
+#   django.contrib.sessions.backends.cached_db  - reads from the cache
+#     (SESSION_CACHE_ALIAS), writes through to the database.
+#   django.contrib.sessions.backends.signed_cookies - no server-side state at
+#     all; a logged-out cookie stays valid until it expires, so keep
+#     SESSION_COOKIE_AGE short.
+# With several workers, cached_db and the user cache below need a shared
+# cache backend, or a logout in one worker is not seen by the others.
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+SESSION_CACHE_ALIAS = os.getenv("SESSION_CACHE_ALIAS", "default")
+SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", str(60 * 60 * 24 * 14)))
+
+# Seconds to cache the authenticated User between requests (0 = off); see
+# accounts.auth_cache.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "0"))
+
+# Loads the session user with its Profile in one query, so role checks need
+# no query of their own; see accounts.backends and accounts.roles.
+AUTHENTICATION_BACKENDS = ['accounts.backends.ProfileModelBackend']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -163,3 +196,33 @@ EMAIL_HOST_PASSWORD = "iqwg hsui hvva iqku"
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+
+# Email audit log: records are buffered in memory and written in batches by a
+# background thread, so logging never adds latency to a send. Backends:
+# eduassist_app.email_log.SupabaseLogBackend (email_logs table in Supabase) or
+# eduassist_app.email_log.DatabaseLogBackend (local EmailLog table).
+EMAIL_LOG_BACKEND = os.getenv("EMAIL_LOG_BACKEND", "eduassist_app.email_log.SupabaseLogBackend")
+EMAIL_LOG_BATCH_SIZE = int(os.getenv("EMAIL_LOG_BATCH_SIZE", "100"))
+EMAIL_LOG_FLUSH_INTERVAL = float(os.getenv("EMAIL_LOG_FLUSH_INTERVAL", "5"))
+EMAIL_LOG_MAX_BUFFER = int(os.getenv("EMAIL_LOG_MAX_BUFFER", "10000"))
+
+# Live notifications (Server-Sent Events at /notifications/stream/).
+# Needs an ASGI server, e.g.
+#   gunicorn eduassist_app.asgi:application -k uvicorn.workers.UvicornWorker
+# Under WSGI leave it off: each open stream would hold a worker thread.
+# Every open stream is an idle coroutine on its worker; one poll per worker
+# (SSE_POLL_INTERVAL seconds) feeds all of them. SSE_MAX_CONNECTIONS caps the
+# streams per worker process; further requests get 503 with Retry-After and
+# browsers fall back to seeing new notifications on the next page load.
+SSE_ENABLED = os.getenv("SSE_ENABLED", "False").lower() in ("1", "true", "yes")
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "5000"))
+SSE_MAX_CONNECTIONS_PER_USER = int(os.getenv("SSE_MAX_CONNECTIONS_PER_USER", "5"))
+SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "1"))
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "20"))
+SSE_RETRY_MS = 5000
+
+# Notification retention, enforced by `manage.py purge_notifications` (run it
+# from cron). Read notifications are removed after NOTIFICATION_RETENTION_DAYS;
+# unread ones are kept unless NOTIFICATION_UNREAD_RETENTION_DAYS is set.
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_UNREAD_RETENTION_DAYS = int(os.getenv("NOTIFICATION_UNREAD_RETENTION_DAYS", "0"))
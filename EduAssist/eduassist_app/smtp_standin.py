@@ -0,0 +1,125 @@
+"""
+A small in-process SMTP server for tests and benchmarks of the mail delivery
+path. It speaks just enough ESMTP for smtplib/Django's SMTP backend (EHLO,
+AUTH PLAIN, MAIL, RCPT, DATA, NOOP, RSET, QUIT) and records what it receives.
+Never use it for real mail.
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server.standin
+        with server.lock:
+            server.connections += 1
+        # Stand-in for the TCP + STARTTLS + AUTH round trips of a real relay
+        if server.connect_latency:
+            time.sleep(server.connect_latency)
+
+        self.reply("220 localhost stand-in ESMTP")
+        mail_from, recipients, sent_here = None, [], 0
+
+        for raw in self.rfile:
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                mail_from, recipients = line[10:].strip(" <>").split(">")[0], []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(line[8:].strip(" <>").split(">")[0])
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for body_line in self.rfile:
+                    if body_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(body_line)
+                with server.lock:
+                    server.messages.append((mail_from, recipients, b"".join(data)))
+                self.reply("250 OK queued")
+                sent_here += 1
+                if server.drop_after and sent_here >= server.drop_after:
+                    # Simulate a relay closing a connection it considers stale
+                    return
+            elif verb in ("NOOP", "RSET"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """
+    Usage:
+
+        with LocalSMTPServer() as smtp:
+            session = MailSession(**smtp.connection_kwargs)
+            ...
+            smtp.messages, smtp.connections
+
+    connect_latency adds a delay to every new connection; drop_after closes a
+    connection after that many messages.
+    """
+
+    def __init__(self, connect_latency=0.0, drop_after=None):
+        self.connect_latency = connect_latency
+        self.drop_after = drop_after
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def connection_kwargs(self):
+        """get_connection() arguments that point Django's SMTP backend here."""
+        return {
+            "backend": "django.core.mail.backends.smtp.EmailBackend",
+            "host": "127.0.0.1",
+            "port": self.port,
+            "username": "standin",
+            "password": "standin",
+            "use_tls": False,
+            "use_ssl": False,
+            "timeout": 5,
+        }
+
+    def start(self):
+        self._server = _ThreadingServer(("127.0.0.1", 0), _SMTPHandler)
+        self._server.standin = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
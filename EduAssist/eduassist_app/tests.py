@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .email_log import BufferedLogSink, DatabaseLogBackend
+
+from .email_service import MailSession, build_notification_email
+from .email_templates import clear_template_cache, get_compiled_template
+from .models import EmailLog
+from .smtp_standin import LocalSMTPServer
+
+
+@mock.patch('eduassist_app.email_service.log_email')
+class MailSessionTests(SimpleTestCase):
+    """MailSession against the in-process SMTP stand-in."""
+
+    def emails(self, count):
+        return [
+            build_notification_email(f"Subject {i}", f"student{i}@cit.edu", "request_approved", {"title": f"T{i}"})
+            for i in range(count)
+        ]
+
+    def test_batches_share_one_connection(self, log_email):
+        with LocalSMTPServer() as smtp:
+            with MailSession(**smtp.connection_kwargs) as session:
+                self.assertEqual(session.send_messages(self.emails(5)), [None] * 5)
+                self.assertEqual(session.send_messages(self.emails(5)), [None] * 5)
+        self.assertEqual(smtp.connections, 1)
+        self.assertEqual(len(smtp.messages), 10)
+        self.assertEqual(smtp.messages[0][1], ["student0@cit.edu"])
+        self.assertEqual(session.throughput()['sent'], 10)
+
+    def test_reconnects_when_server_drops_the_connection(self, log_email):
+        with LocalSMTPServer(drop_after=3) as smtp:
+            with MailSession(**smtp.connection_kwargs) as session:
+                results = session.send_messages(self.emails(7))
+        self.assertEqual(results, [None] * 7)
+        self.assertEqual(len(smtp.messages), 7)
+        self.assertEqual((smtp.connections, session.reconnects), (3, 2))
+
+    def test_stale_idle_connection_is_replaced(self, log_email):
+        with LocalSMTPServer(drop_after=1) as smtp:
+            with MailSession(**smtp.connection_kwargs) as session:
+                session.send_messages(self.emails(1))
+                session.last_used -= MailSession.IDLE_TIMEOUT + 1
+                self.assertEqual(session.send_messages(self.emails(1)), [None])
+        self.assertEqual((smtp.connections, session.reconnects, session.failed), (2, 1, 0))
+
+    def test_unreachable_server_fails_each_message(self, log_email):
+        with LocalSMTPServer() as smtp:
+            kwargs = smtp.connection_kwargs
+        results = MailSession(**kwargs).send_messages(self.emails(2))
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(isinstance(error, OSError) for error in results))
+
+
+class EmailTemplateCacheTests(SimpleTestCase):
+    """Compiled email templates are reused until the file changes."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(EMAIL_TEMPLATES_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        clear_template_cache()
+        self.write("<p>Hi {{ name }},</p>\n{% if note %}<blockquote>{{ note }}</blockquote>{% endif %}\n<p>Bye<br>Team</p>")
+
+    def write(self, source, bump=0):
+        path = os.path.join(self.directory, "notice.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        if bump:
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+    def test_compiled_once_per_version(self):
+        first = get_compiled_template("notice")
+        with mock.patch("builtins.open") as read:
+            self.assertIs(get_compiled_template("notice"), first)
+        read.assert_not_called()
+
+        self.write("<p>Hello {{ name }}</p>", bump=10**9)
+        second = get_compiled_template("notice")
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"name": "Ana"})[0], "<p>Hello Ana</p>")
+
+    def test_missing_template(self):
+        self.assertIsNone(get_compiled_template("absent"))
+
+    def test_plain_text_alternative(self):
+        html, text = get_compiled_template("notice").render({"name": "O'Brien", "note": "a < b"})
+        self.assertIn("O&#x27;Brien", html)
+        self.assertEqual(text, "Hi O'Brien,\n\na < b\n\nBye\nTeam")
+        _, text = get_compiled_template("notice").render({"name": "Ana"})
+        self.assertEqual(text, "Hi Ana,\n\nBye\nTeam")
+
+    @mock.patch('eduassist_app.email_service.log_email')
+    def test_notification_email_carries_both_parts(self, log_email):
+        email = build_notification_email("Subject", "ana@cit.edu", "notice", {"name": "Ana"})
+        self.assertEqual(email.body, "Hi Ana,\n\nBye\nTeam")
+        self.assertEqual(email.alternatives[0][1], "text/html")
+
+
+class ListBackend:
+    def __init__(self, fail=False, delay=0):
+        self.batches = []
+        self.fail = fail
+        self.delay = delay
+
+    def write(self, records):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("supabase unreachable")
+        self.batches.append(records)
+
+
+class BufferedLogSinkTests(SimpleTestCase):
+    """The email log sink batches records off the caller's thread."""
+
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_flushes_when_batch_is_full(self):
+        backend = ListBackend()
+        sink = BufferedLogSink(backend, batch_size=3, flush_interval=60)
+        for i in range(7):
+            sink.emit({"status": i})
+        self.wait_for(lambda: len(backend.batches) == 2)
+        self.assertEqual([len(batch) for batch in backend.batches], [3, 3])
+        sink.close()
+        self.assertEqual([record["status"] for batch in backend.batches for record in batch], list(range(7)))
+
+    def test_flushes_on_timer(self):
+        backend = ListBackend()
+        sink = BufferedLogSink(backend, batch_size=100, flush_interval=0.05)
+        sink.emit({"status": "Sent"})
+        self.wait_for(lambda: backend.batches == [[{"status": "Sent"}]])
+        sink.close()
+
+    def test_slow_or_failing_backend_never_blocks_emit(self):
+        sink = BufferedLogSink(ListBackend(fail=True, delay=0.2), batch_size=1, flush_interval=60, max_buffer=5)
+        started = time.monotonic()
+        with mock.patch("builtins.print"):
+            for i in range(20):
+                sink.emit({"status": i})
+            self.assertLess(time.monotonic() - started, 0.1)
+            self.assertGreater(sink.dropped, 0)
+            sink.close(timeout=0)
+        self.assertEqual(sink.written, 0)
+
+
+class DatabaseLogBackendTests(TestCase):
+
+    def test_batch_is_one_insert(self):
+        now = timezone.now()
+        records = [
+            {"to_email": f"s{i}@cit.edu", "type": "request_approved", "status": "Sent", "message": "", "created_at": now}
+            for i in range(10)
+        ]
+        with self.assertNumQueries(1):
+            DatabaseLogBackend().write(records)
+        self.assertEqual(EmailLog.objects.filter(status="Sent", created_at=now).count(), 10)
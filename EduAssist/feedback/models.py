@@ -19,5 +19,11 @@ class Feedback(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Staff "all feedback" listing, newest first
+            models.Index(fields=['-created_at'], name='feedback_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.rating} Stars"
@@ -1,3 +1,23 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Feedback
+
+
+class FeedbackIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('student', 'student@cit.edu', 'x')
+        Feedback.objects.bulk_create(
+            Feedback(user=user, rating=i % 5 + 1, comment=f"Comment {i}") for i in range(300)
+        )
+
+    def test_all_feedback_uses_created_index(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+        # Same query as the staff all_feedback view
+        plan = Feedback.objects.all().order_by('-created_at')[:50].explain()
+        self.assertIn('feedback_created_idx', plan, plan)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Tag, Request, Notification  # <--- Added Notification here
+from .models import Tag, Request, Notification, NotificationArchive, RequestStats  # <--- Added Notification here
 
 # ------------------------
 # Tag Admin
@@ -28,4 +28,21 @@ class RequestAdmin(admin.ModelAdmin):
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("user", "message", "is_read", "created_at")
     list_filter = ("is_read", "created_at")
-    search_fields = ("user__username", "message")
\ No newline at end of file
+    search_fields = ("user__username", "message")
+
+# ------------------------
+# Notification Archive Admin
+# ------------------------
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ("user", "message", "created_at", "archived_at")
+    search_fields = ("user__username", "message")
+    readonly_fields = ("id", "user", "message", "related_request_id", "created_at", "archived_at")
+
+# ------------------------
+# Request Stats Admin
+# ------------------------
+@admin.register(RequestStats)
+class RequestStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "total_count", "pending_count", "approved_count", "cancelled_count", "updated_at")
+    readonly_fields = ("total_count", "pending_count", "approved_count", "cancelled_count", "updated_at")
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class RequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'request_app'
+
+    def ready(self):
+        import request_app.signals
+
+        post_migrate.connect(request_app.signals.install_search_index, sender=self)
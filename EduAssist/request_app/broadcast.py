@@ -0,0 +1,219 @@
+"""
+In-process fan-out of new notifications to Server-Sent Events streams.
+
+Each worker process runs one poll task, and only while it has subscribers.
+The task reads rows newer than the last id it has seen with a single
+indexed query, whatever the number of connected browsers. Ids are handed
+out before transactions commit, so a row can appear after a higher id was
+already read; the ids skipped over are re-checked in the same query for
+MISSING_ID_TTL seconds before they are taken as rolled back. It also reads the
+stored unread counters for the connected users, so a mark-read in another
+tab (or through another worker) updates the badge too. New data is pushed to one bounded queue per
+connection.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Notification
+from .notifications import unread_count, unread_counts
+
+POLL_BATCH = 500
+QUEUE_SIZE = 50
+# How long a skipped id is re-checked (its transaction may still commit)
+MISSING_ID_TTL = 30
+# Larger jumps are not gaps left by open transactions; they are not tracked
+MAX_MISSING_IDS = 1000
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client; it catches up through Last-Event-ID when it reconnects
+            pass
+
+
+def notification_event(notification):
+    return {
+        'event': 'notification',
+        'id': notification.id,
+        'data': {
+            'id': notification.id,
+            'message': notification.message,
+            'created_at': notification.created_at.isoformat(),
+            'related_request_id': notification.related_request_id,
+        },
+    }
+
+
+def _latest_id():
+    return Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def _notifications_after(last_id, user_id=None, limit=POLL_BATCH, missing_ids=()):
+    """Rows above last_id, plus any of `missing_ids` that have committed since."""
+    condition = Q(id__gt=last_id)
+    if missing_ids:
+        condition |= Q(id__in=missing_ids)
+    queryset = Notification.objects.filter(condition)
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    return list(
+        queryset.only('id', 'user_id', 'message', 'created_at', 'related_request_id').order_by('id')[:limit]
+    )
+
+
+class NotificationBroadcaster:
+    """
+    Registry of open notification streams in this worker. Limits: at most
+    SSE_MAX_CONNECTIONS streams per worker process and
+    SSE_MAX_CONNECTIONS_PER_USER per user; subscribe() raises
+    TooManySubscribers beyond that.
+    """
+
+    def __init__(self):
+        self.subscribers = {}  # user_id -> set of Subscription
+        self.count = 0
+        self._task = None
+        self._last_id = None
+        self._missing = {}  # id skipped below _last_id -> time it was first missed
+        self._unread = {}  # user_id -> last count pushed
+
+    @property
+    def max_connections(self):
+        return settings.SSE_MAX_CONNECTIONS
+
+    @property
+    def max_per_user(self):
+        return settings.SSE_MAX_CONNECTIONS_PER_USER
+
+    def has_capacity(self, user_id):
+        return self.count < self.max_connections and len(self.subscribers.get(user_id, ())) < self.max_per_user
+
+    def subscribe(self, user_id):
+        if not self.has_capacity(user_id):
+            raise TooManySubscribers
+        subscription = Subscription(user_id)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        self.count += 1
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self.subscribers.get(subscription.user_id)
+        if not subscriptions or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        self.count -= 1
+        if not subscriptions:
+            del self.subscribers[subscription.user_id]
+            self._unread.pop(subscription.user_id, None)
+
+    def publish(self, user_id, event):
+        for subscription in self.subscribers.get(user_id, ()):
+            subscription.put(event)
+
+    async def _poll(self):
+        self._last_id = await sync_to_async(_latest_id)()
+        while self.subscribers:
+            await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Error polling notifications: {e}")
+        # Idle: the next subscriber starts from the then-latest row
+        self._task = None
+        self._missing = {}
+
+    def _track_gap(self, start, end, now):
+        """Remember ids in [start, end) as not committed yet."""
+        if end - start <= MAX_MISSING_IDS:
+            for missing_id in range(start, end):
+                self._missing.setdefault(missing_id, now)
+
+    async def tick(self):
+        """One poll: push rows created since the last tick and changed unread counts."""
+        new = await sync_to_async(_notifications_after)(self._last_id, missing_ids=list(self._missing))
+        now = time.monotonic()
+        for notification in new:
+            self.publish(notification.user_id, notification_event(notification))
+            self._missing.pop(notification.id, None)
+            if notification.id > self._last_id:
+                self._track_gap(self._last_id + 1, notification.id, now)
+                self._last_id = notification.id
+        self._missing = {
+            missing_id: since for missing_id, since in self._missing.items() if now - since < MISSING_ID_TTL
+        }
+
+        counts = await sync_to_async(unread_counts)(list(self.subscribers))
+        for user_id, count in counts.items():
+            if count != self._unread.get(user_id):
+                self._unread[user_id] = count
+                self.publish(user_id, {'event': 'unread', 'data': {'count': count}})
+
+
+broadcaster = NotificationBroadcaster()
+
+
+def format_event(event):
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'])}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(user_id, last_event_id=None):
+    """
+    Body of one SSE response: catch-up after a reconnect, the current unread
+    count, then events from the broadcaster with keep-alive comments between.
+    """
+    try:
+        subscription = broadcaster.subscribe(user_id)
+    except TooManySubscribers:
+        yield f"retry: {settings.SSE_RETRY_MS * 10}\n\n"
+        return
+
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+
+        caught_up = set()
+        if last_event_id and last_event_id.isdigit():
+            for notification in await sync_to_async(_notifications_after)(int(last_event_id), user_id):
+                yield format_event(notification_event(notification))
+                caught_up.add(notification.id)
+
+        count = await sync_to_async(unread_count)(user_id)
+        yield format_event({'event': 'unread', 'data': {'count': count}})
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.SSE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            if event['event'] == 'notification' and event['id'] in caught_up:
+                continue  # already sent during catch-up; a lower id may still be new
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
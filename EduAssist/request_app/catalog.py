@@ -0,0 +1,74 @@
+from django.db.models import F
+
+from .models import CatalogVersion, Category, CategoryChoice
+
+# Version stamp kept in the database (CatalogVersion row 1), so every worker
+# sees a bump as soon as it commits; each process reloads its local copy when
+# the stamp it holds no longer matches.
+CATALOG_VERSION_ID = 1
+
+_local = None  # (version, catalog) for this process
+
+
+def get_version():
+    """One primary-key read; 0 when the row is missing (bump_version recreates it)."""
+    version = CatalogVersion.objects.filter(id=CATALOG_VERSION_ID).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_version():
+    # Runs in the writer's transaction: a rollback undoes the bump as well
+    if not CatalogVersion.objects.filter(id=CATALOG_VERSION_ID).update(version=F('version') + 1):
+        CatalogVersion.objects.get_or_create(id=CATALOG_VERSION_ID, defaults={'version': 2})
+
+
+def _load():
+    categories = [
+        {'id': pk, 'name': name, 'description': description, 'choices': []}
+        for pk, name, description in Category.objects.values_list('id', 'name', 'description')
+    ]
+    by_id = {category['id']: category for category in categories}
+
+    choices = []
+    for pk, value, category_id in CategoryChoice.objects.order_by('id').values_list('id', 'value', 'category_id'):
+        category = by_id[category_id]
+        choice = {'id': pk, 'value': value, 'category': category}
+        category['choices'].append(choice)
+        choices.append(choice)
+
+    return {'categories': categories, 'choices': choices, 'categories_by_id': by_id,
+            'choices_by_id': {choice['id']: choice for choice in choices}}
+
+
+def get_catalog(refresh=False):
+    """
+    The category tree as plain dicts (categories in name order, each with its
+    choices). Served from process memory while the version stamp is unchanged;
+    refresh=True reloads it regardless. Callers must treat the result as
+    read-only.
+    """
+    global _local
+    version = get_version()
+    local = _local
+    if refresh or local is None or local[0] != version:
+        local = (version, _load())
+        _local = local
+    return local[1]
+
+
+def catalog_etag(request=None):
+    return f"catalog-{get_version()}"
+
+
+def catalog_json():
+    """Payload for the cascading category -> query type dropdowns."""
+    return {
+        'categories': [
+            {
+                'id': category['id'],
+                'name': category['name'],
+                'choices': [{'id': choice['id'], 'value': choice['value']} for choice in category['choices']],
+            }
+            for category in get_catalog()['categories']
+        ]
+    }
@@ -1,12 +1,20 @@
-# Create new file: request_app/context_processors.py
-from .models import Notification
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .notifications import recent_notifications, unread_count
+
 
 def user_notifications(request):
-    if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-        recent_notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:5]
-        return {
-            'unread_notifications_count': unread_count,
-            'recent_notifications': recent_notifications
-        }
-    return {}
\ No newline at end of file
+    # Lazy: nothing is queried (not even the session user) unless the
+    # template actually renders the notification bell.
+    def count():
+        return unread_count(request.user.id) if request.user.is_authenticated else 0
+
+    def recent():
+        return list(recent_notifications(request.user.id)) if request.user.is_authenticated else []
+
+    return {
+        'unread_notifications_count': SimpleLazyObject(count),
+        'recent_notifications': SimpleLazyObject(recent),
+        'notification_stream_enabled': settings.SSE_ENABLED,
+    }
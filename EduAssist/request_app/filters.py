@@ -0,0 +1,36 @@
+from django.db.models import Exists, OuterRef
+
+from .models import Request
+
+RequestTag = Request.tags.through
+
+
+def _tag_link(slugs):
+    """Correlated subquery: a link row from the outer request to one of `slugs`."""
+    return RequestTag.objects.filter(request_id=OuterRef('pk'), tag__slug__in=slugs)
+
+
+def filter_requests(queryset, tags=(), tag_mode='any', categories=(), statuses=(), priorities=()):
+    """
+    Apply the request list filters. Tag filters are correlated EXISTS
+    subqueries instead of joins, so rows are never duplicated and the
+    queryset needs no DISTINCT.
+
+    tag_mode='any' keeps requests with at least one of the tags (OR);
+    tag_mode='all' keeps requests carrying every tag (AND).
+    """
+    if categories:
+        queryset = queryset.filter(category_id__in=categories)
+    if statuses:
+        queryset = queryset.filter(status_rank__in=[Request.STATUS_RANKS[s] for s in statuses if s in Request.STATUS_RANKS])
+    if priorities:
+        queryset = queryset.filter(priority_rank__in=[Request.PRIORITY_RANKS[p] for p in priorities if p in Request.PRIORITY_RANKS])
+
+    tags = list(dict.fromkeys(tags))
+    if tags:
+        if tag_mode == 'all':
+            for slug in tags:
+                queryset = queryset.filter(Exists(_tag_link([slug])))
+        else:
+            queryset = queryset.filter(Exists(_tag_link(tags)))
+    return queryset
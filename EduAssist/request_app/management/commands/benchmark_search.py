@@ -0,0 +1,98 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from request_app.models import Request
+from request_app.search import search_requests
+
+User = get_user_model()
+
+WORDS = (
+    "enrollment transcript grade schedule library scholarship tuition clearance "
+    "certificate laboratory thesis adviser internship section subject petition "
+    "overload shifting retake payment account password portal network printer "
+    "classroom projector examination deadline extension records registrar dean"
+).split()
+
+
+def filler(rng):
+    # Pseudo-words from a large vocabulary keep the domain words selective
+    return f"w{rng.randrange(20000)}"
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic requests inside a rolled-back transaction and compare "
+        "the old icontains search with the full-text search backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--query', default='transcript registrar')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, rows, query, repeat, **options):
+        try:
+            with transaction.atomic():
+                self.seed(rows)
+                self.run(query, repeat)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Seeded rows rolled back.")
+
+    def seed(self, rows):
+        rng = random.Random(42)
+        user = User.objects.create_user(username="benchmark search user", email="bench@cit.edu")
+        started = time.perf_counter()
+        batch = []
+        for i in range(rows):
+            req = Request(
+                user=user,
+                title=" ".join(rng.choices(WORDS, k=3) + [filler(rng)]),
+                description=" ".join(rng.choices(WORDS, k=4) + [filler(rng) for _ in range(30)]),
+                status=rng.choice(['pending', 'approved', 'cancelled']),
+                priority=rng.choice(['low', 'medium', 'high', 'critical']),
+            )
+            req.sync_ranks()  # bulk_create skips save()
+            batch.append(req)
+            if len(batch) == 5000:
+                Request.objects.bulk_create(batch)
+                batch = []
+        Request.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE request_app_request")
+        self.stdout.write(f"Seeded {rows} requests in {time.perf_counter() - started:.1f}s ({connection.vendor})")
+
+    def run(self, query, repeat):
+        def old_path():
+            terms = query.split()
+            condition = Q()
+            for term in terms:
+                condition &= Q(title__icontains=term) | Q(description__icontains=term)
+            queryset = Request.objects.filter(condition)
+            return queryset.count(), list(queryset.order_by('-date')[:20])
+
+        def new_path():
+            queryset = search_requests(Request.objects.all(), query)
+            return queryset.count(), list(queryset.order_by('-search_rank')[:20])
+
+        for label, func in (("icontains", old_path), ("full-text", new_path)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                matches, _page = func()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{label:>10}: {matches} matches, median {statistics.median(timings):.1f} ms, "
+                f"best {min(timings):.1f} ms"
+            )
@@ -0,0 +1,120 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from request_app.filters import filter_requests
+from request_app.models import Request, Tag
+
+User = get_user_model()
+RequestTag = Request.tags.through
+
+ORDERING = ['status_rank', 'priority_rank', '-date', '-id']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed requests and tag links inside a rolled-back transaction and compare "
+        "the old JOIN + DISTINCT tag filter with the EXISTS-based filter engine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100_000)
+        parser.add_argument('--links', type=int, default=1_000_000)
+        parser.add_argument('--tags', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, requests, links, tags, repeat, **options):
+        try:
+            with transaction.atomic():
+                slugs = self.seed(requests, links, tags)
+                self.run(slugs, repeat)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Seeded rows rolled back.")
+
+    def seed(self, request_count, link_count, tag_count):
+        rng = random.Random(7)
+        started = time.perf_counter()
+        user = User.objects.create_user(username="benchmark tag user", email="bench@cit.edu")
+
+        Tag.objects.bulk_create(
+            [Tag(name=f"bench-tag-{i}", slug=f"bench-tag-{i}") for i in range(tag_count)], batch_size=1000
+        )
+        tag_ids = list(Tag.objects.filter(slug__startswith="bench-tag-").order_by('id').values_list('id', flat=True))
+
+        batch = []
+        for i in range(request_count):
+            req = Request(
+                user=user,
+                title=f"Benchmark request {i}",
+                description="Seeded by benchmark_tag_filter",
+                status=rng.choice(['pending', 'approved', 'cancelled']),
+                priority=rng.choice(['low', 'medium', 'high', 'critical']),
+            )
+            req.sync_ranks()  # bulk_create skips save()
+            batch.append(req)
+        Request.objects.bulk_create(batch, batch_size=5000)
+        request_ids = list(Request.objects.filter(user=user).values_list('id', flat=True))
+
+        # Skewed tag popularity, like real tagging: a few tags are on many requests
+        per_request = max(link_count // max(request_count, 1), 1)
+        weights = [1 / (rank + 1) for rank in range(len(tag_ids))]
+        links = []
+        for request_id in request_ids:
+            chosen = set()
+            while len(chosen) < min(per_request, len(tag_ids)):
+                chosen.update(rng.choices(tag_ids, weights=weights, k=per_request - len(chosen)))
+            links.extend(RequestTag(request_id=request_id, tag_id=tag_id) for tag_id in chosen)
+            if len(links) >= 20_000:
+                RequestTag.objects.bulk_create(links)
+                links = []
+        RequestTag.objects.bulk_create(links)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        total_links = RequestTag.objects.filter(request__user=user).count()
+        self.stdout.write(
+            f"Seeded {len(request_ids)} requests and {total_links} tag links "
+            f"in {time.perf_counter() - started:.1f}s ({connection.vendor})"
+        )
+        return [f"bench-tag-{i}" for i in range(tag_count)]
+
+    def run(self, slugs, repeat):
+        popular, common, rare = slugs[0], slugs[10], slugs[-1]
+
+        def old_single():
+            # The previous RequestListView: JOIN through tags, then DISTINCT
+            queryset = Request.objects.filter(tags__slug=common).order_by(*ORDERING).distinct()
+            return queryset.count(), list(queryset[:10])
+
+        def exists(tags, mode):
+            def query():
+                queryset = filter_requests(Request.objects.all(), tags=tags, tag_mode=mode).order_by(*ORDERING)
+                return queryset.count(), list(queryset[:10])
+            return query
+
+        cases = [
+            ("JOIN+DISTINCT, 1 tag", old_single),
+            ("EXISTS, 1 tag", exists([common], 'any')),
+            ("EXISTS, any of 3", exists([popular, common, rare], 'any')),
+            ("EXISTS, all of 2", exists([popular, common], 'all')),
+        ]
+        for label, func in cases:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                matches, _page = func()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{label:>22}: {matches} matches, median {statistics.median(timings):.1f} ms, "
+                f"best {min(timings):.1f} ms"
+            )
@@ -0,0 +1,137 @@
+import asyncio
+import resource
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from request_app.broadcast import broadcaster
+from request_app.models import Notification
+
+User = get_user_model()
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Open thousands of idle notification streams against the ASGI application "
+        "in this process, then measure memory per stream, event-loop lag and the "
+        "time to fan one notification out to every stream."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--idle', type=float, default=3.0, help="Seconds to hold the idle streams.")
+
+    def handle(self, *args, connections, users, idle, **options):
+        accounts, cookies = self.seed(users)
+        try:
+            with override_settings(
+                SSE_ENABLED=True,
+                SSE_MAX_CONNECTIONS=connections,
+                SSE_MAX_CONNECTIONS_PER_USER=connections,
+            ):
+                asyncio.run(self.run(accounts, cookies, connections, idle))
+        finally:
+            Session.objects.filter(session_key__in=[cookie.split('=', 1)[1] for cookie in cookies]).delete()
+            User.objects.filter(id__in=[user.id for user in accounts]).delete()
+            self.stdout.write("Load-test users, sessions and notifications removed.")
+
+    def seed(self, count):
+        User.objects.bulk_create([User(username=f"sse-loadtest-{i}", password="!") for i in range(count)])
+        accounts = list(User.objects.filter(username__startswith="sse-loadtest-").order_by('id'))
+
+        cookies = []
+        for user in accounts:
+            session = SessionStore()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            cookies.append(f"{settings.SESSION_COOKIE_NAME}={session.session_key}")
+        return accounts, cookies
+
+    async def run(self, accounts, cookies, connections, idle):
+        app = get_asgi_application()
+        path = reverse('notification_stream')
+        disconnect = asyncio.Event()
+        received = {}
+
+        async def stream(index):
+            cookie = cookies[index % len(cookies)].encode()
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'cookie', cookie), (b'accept', b'text/event-stream')],
+                'client': ('127.0.0.1', 40000 + index % 20000), 'server': ('localhost', 80),
+            }
+            requested = False
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and b'event: notification' in message.get('body', b''):
+                    received.setdefault(index, time.perf_counter())
+
+            await app(scope, receive, send)
+
+        baseline = peak_rss()
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(stream(i)) for i in range(connections)]
+        while broadcaster.count < connections:
+            if all(task.done() for task in tasks):
+                raise RuntimeError("Streams closed before subscribing; check SSE settings and authentication.")
+            await asyncio.sleep(0.05)
+        opened = time.perf_counter() - started
+        per_stream = (peak_rss() - baseline) / connections
+        self.stdout.write(
+            f"{connections} streams for {len(accounts)} users open in {opened:.2f}s, "
+            f"~{per_stream / 1024:.1f} KiB resident memory per stream"
+        )
+
+        # Event-loop responsiveness while every stream sits idle
+        lag = 0.0
+        deadline = time.perf_counter() + idle
+        while time.perf_counter() < deadline:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.1)
+            lag = max(lag, time.perf_counter() - tick - 0.1)
+        self.stdout.write(f"Idle for {idle:.1f}s: worst event-loop lag {lag * 1000:.1f} ms")
+
+        # One notification per user; every one of that user's streams must receive it
+        sent_at = time.perf_counter()
+        await sync_to_async(Notification.objects.bulk_create)(
+            [Notification(user=user, message="Load test") for user in accounts]
+        )
+        while len(received) < connections and time.perf_counter() - sent_at < 30:
+            await asyncio.sleep(0.01)
+        latencies = sorted(moment - sent_at for moment in received.values())
+        if latencies:
+            self.stdout.write(
+                f"Fan-out: {len(received)}/{connections} streams notified, "
+                f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms "
+                f"(poll interval {settings.SSE_POLL_INTERVAL:g}s, one query per poll)"
+            )
+
+        disconnect.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stdout.write(f"Disconnected; {broadcaster.count} stream(s) still registered.")
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from request_app.retention import BATCH_SIZE, expired_notifications, purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete notifications past the retention policy (NOTIFICATION_RETENTION_DAYS "
+        "for read ones, NOTIFICATION_UNREAD_RETENTION_DAYS for unread ones) in small "
+        "batches, optionally copying them to the archive table first. Safe to "
+        "interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--archive', action='store_true', help="Copy rows to NotificationArchive before deleting.")
+        parser.add_argument('--after-id', type=int, default=0, help="Resume after this notification id.")
+        parser.add_argument('--max-batches', type=int, default=None)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the expired notifications.")
+
+    def handle(self, *args, batch_size, archive, after_id, max_batches, pause, dry_run, **options):
+        self.stdout.write(
+            f"Retention: read {settings.NOTIFICATION_RETENTION_DAYS} days, "
+            f"unread {settings.NOTIFICATION_UNREAD_RETENTION_DAYS or 'forever'}"
+        )
+        if dry_run:
+            count = expired_notifications().filter(id__gt=after_id).count()
+            self.stdout.write(f"{count} notification(s) would be removed.")
+            return
+
+        def on_batch(removed, last_id):
+            self.stdout.write(f"Removed {removed} notification(s) through id {last_id}")
+            if pause:
+                time.sleep(pause)
+
+        total = purge_expired(
+            batch_size=batch_size,
+            archive=archive,
+            after_id=after_id,
+            max_batches=max_batches,
+            on_batch=on_batch,
+        )
+        action = "Archived and removed" if archive else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {total} notification(s)."))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from request_app import stats
+from request_app.models import Request, RequestStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the RequestStats dashboard counters from the Request table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Only report rows that drifted from the Request table; do not write.",
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            dest='user_id',
+            help="Only check the stats row of this user id (and the global row).",
+        )
+
+    def handle(self, *args, verify=False, user_id=None, **options):
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            # Every user with requests or an existing row; stale rows are zeroed.
+            user_ids = set(Request.objects.values_list('user_id', flat=True).distinct())
+            user_ids.update(RequestStats.objects.filter(user__isnull=False).values_list('user_id', flat=True))
+            user_ids = sorted(user_ids)
+
+        drifted = 0
+        for uid in [None] + user_ids:
+            expected, stored = stats.rebuild(uid, fix=not verify)
+            if stored != expected:
+                drifted += 1
+                label = f"user {uid}" if uid is not None else "global"
+                self.stdout.write(f"{label}: stored={stored} expected={expected}")
+
+        checked = len(user_ids) + 1
+        if verify:
+            style = self.style.SUCCESS if not drifted else self.style.WARNING
+            self.stdout.write(style(f"Verified {checked} rows, {drifted} out of sync."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {checked} rows, {drifted} corrected."))
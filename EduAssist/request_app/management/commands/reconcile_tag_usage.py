@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from request_app.tagging import reconcile_usage_counts
+
+
+class Command(BaseCommand):
+    help = "Recount Tag.usage_count from the request/tag link table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Only report drifted tags; do not write.",
+        )
+
+    def handle(self, *args, verify=False, **options):
+        drifted = reconcile_usage_counts(fix=not verify)
+        for tag, stored, actual in drifted:
+            self.stdout.write(f"{tag.name}: stored={stored} actual={actual}")
+
+        if verify:
+            style = self.style.SUCCESS if not drifted else self.style.WARNING
+            self.stdout.write(style(f"{len(drifted)} tag(s) out of sync."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Corrected {len(drifted)} tag(s)."))
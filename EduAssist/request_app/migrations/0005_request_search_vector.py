@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:08
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The tsvector is rebuilt only when title/description change, so status
+# updates don't pay for re-tokenizing the description.
+POSTGRES_FORWARD = """
+CREATE OR REPLACE FUNCTION request_app_request_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.title IS NOT DISTINCT FROM OLD.title
+       AND NEW.description IS NOT DISTINCT FROM OLD.description
+       AND OLD.search_vector IS NOT NULL THEN
+        NEW.search_vector := OLD.search_vector;
+    ELSE
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER request_app_request_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON request_app_request
+    FOR EACH ROW EXECUTE FUNCTION request_app_request_search_vector_update();
+
+UPDATE request_app_request SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B');
+
+CREATE INDEX request_app_request_search_vector_gin
+    ON request_app_request USING gin (search_vector);
+"""
+
+POSTGRES_REVERSE = """
+DROP INDEX IF EXISTS request_app_request_search_vector_gin;
+DROP TRIGGER IF EXISTS request_app_request_search_vector_trigger ON request_app_request;
+DROP FUNCTION IF EXISTS request_app_request_search_vector_update();
+"""
+
+
+def install_search_trigger(apps, schema_editor):
+    # SQLite uses an FTS5 table instead, installed after migrate (request_app.search).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_FORWARD)
+
+
+def remove_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0004_requeststats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(install_search_trigger, remove_search_trigger),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Value, When
+
+# Frozen copies of Request.STATUS_RANKS / PRIORITY_RANKS at this migration
+STATUS_RANKS = {'pending': 1, 'approved': 2, 'cancelled': 3}
+PRIORITY_RANKS = {'critical': 1, 'high': 2, 'medium': 3, 'low': 4}
+
+
+def backfill_ranks(apps, schema_editor):
+    Request = apps.get_model('request_app', 'Request')
+    Request.objects.update(
+        status_rank=Case(
+            *[When(status=value, then=Value(rank)) for value, rank in STATUS_RANKS.items()],
+            default=Value(len(STATUS_RANKS) + 1),
+            output_field=IntegerField(),
+        ),
+        priority_rank=Case(
+            *[When(priority=value, then=Value(rank)) for value, rank in PRIORITY_RANKS.items()],
+            default=Value(len(PRIORITY_RANKS) + 1),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0005_request_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=3, editable=False),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='status_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(backfill_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status_rank', 'priority_rank', '-date', '-id'], name='request_rank_order_idx'),
+        ),
+    ]
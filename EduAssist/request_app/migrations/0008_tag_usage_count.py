@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_usage_counts(apps, schema_editor):
+    Tag = apps.get_model('request_app', 'Tag')
+    RequestTag = apps.get_model('request_app', 'Request').tags.through
+    usage = (
+        RequestTag.objects.filter(tag_id=OuterRef('pk'))
+        .order_by().values('tag_id').annotate(n=Count('*')).values('n')
+    )
+    Tag.objects.update(usage_count=Coalesce(Subquery(usage), 0))
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_usage_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(condition=models.Q(('usage_count__gt', 0)), fields=['name'], name='tag_in_use_name_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:11
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_global_rows(apps, schema_editor):
+    # Keep the oldest global row; `manage.py rebuild_request_stats` recounts it
+    RequestStats = apps.get_model('request_app', 'RequestStats')
+    keep = RequestStats.objects.filter(user__isnull=True).order_by('id').values_list('id', flat=True).first()
+    if keep is not None:
+        RequestStats.objects.filter(user__isnull=True).exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0010_notification_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_global_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='requeststats',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('user', models.Value(0)), condition=models.Q(('user__isnull', True)), name='requeststats_single_global_row'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0011_requeststats_single_global_row'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificationarchive',
+            name='related_request_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0013_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationwatermark',
+            name='unread_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationwatermark',
+            name='unread_counted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+def mark_existing_rows_seeded(apps, schema_editor):
+    # Rows written before this migration were seeded by counting the table
+    RequestStats = apps.get_model('request_app', 'RequestStats')
+    RequestStats.objects.update(seeded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request_app', '0014_notification_unread_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requeststats',
+            name='seeded',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_existing_rows_seeded, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 from django.utils.text import slugify
@@ -30,6 +32,20 @@ class CategoryChoice(models.Model):
     def __str__(self):
         return f"{self.category.name} - {self.value}"
 
+# ------------------------
+# Category Catalog Version
+# ------------------------
+class CatalogVersion(models.Model):
+    """
+    Single row (id=1) whose version is bumped by every write to Category or
+    CategoryChoice (see request_app.signals). Every worker reads it to tell
+    whether its in-memory copy of the catalog is still current.
+    """
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
 # ------------------------
 # Tag Model
 # ------------------------
@@ -40,11 +56,18 @@ class Tag(models.Model):
         validators=[RegexValidator(regex='^[A-Za-z0-9-]+$', message='Tags can only contain letters, numbers, and hyphens.')]
     )
     slug = models.SlugField(max_length=50, unique=True, blank=True)
+    # Number of requests using this tag; maintained by request_app.signals,
+    # repaired by `manage.py reconcile_tag_usage`.
+    usage_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Tag sidebar: tags in use, alphabetical
+            models.Index(fields=['name'], condition=models.Q(usage_count__gt=0), name='tag_in_use_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -58,10 +81,20 @@ class Tag(models.Model):
 # ------------------------
 # Request Model
 # ------------------------
+class RequestManager(models.Manager):
+    def get_queryset(self):
+        # The tsvector is only read inside search queries, never by Python code
+        return super().get_queryset().defer('search_vector')
+
+
 class Request(models.Model):
     STATUS_CHOICES = [('pending', 'Pending'), ('approved', 'Approved'), ('cancelled', 'Cancelled')]
     PRIORITY_CHOICES = [('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')]
 
+    # Sort keys for the Status -> Priority ordering (Pending first, Critical first)
+    STATUS_RANKS = {value: rank for rank, (value, _label) in enumerate(STATUS_CHOICES, start=1)}
+    PRIORITY_RANKS = {value: rank for rank, (value, _label) in enumerate(reversed(PRIORITY_CHOICES), start=1)}
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='requests')
     title = models.CharField(max_length=200)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -73,13 +106,46 @@ class Request(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
     category_choice = models.ForeignKey(CategoryChoice, on_delete=models.SET_NULL, null=True, blank=True)
     tags = models.ManyToManyField(Tag, related_name='requests', blank=True)
+    # Full-text index of title + description, maintained by a database trigger
+    # on PostgreSQL (see request_app.search); unused on SQLite, which uses FTS5.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    # Denormalized from status/priority on save(); see STATUS_RANKS / PRIORITY_RANKS
+    status_rank = models.PositiveSmallIntegerField(default=1, editable=False)
+    priority_rank = models.PositiveSmallIntegerField(default=3, editable=False)
+
+    objects = RequestManager()
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            # Serves the dashboard ordering (status, priority, newest) straight off the index
+            models.Index(fields=['status_rank', 'priority_rank', '-date', '-id'], name='request_rank_order_idx'),
+            # Same ordering for a student's own requests (dashboard, request list, stats fallback)
+            models.Index(fields=['user', 'status_rank', 'priority_rank', '-date', '-id'], name='request_user_rank_order_idx'),
+            # Default '-date' ordering of a user's requests (feedback form choices)
+            models.Index(fields=['user', '-date'], name='request_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
 
+    def sync_ranks(self):
+        """Recompute the sort keys; unknown values sort after the known ones."""
+        self.status_rank = self.STATUS_RANKS.get(self.status, len(self.STATUS_RANKS) + 1)
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, len(self.PRIORITY_RANKS) + 1)
+
+    def save(self, *args, **kwargs):
+        self.sync_ranks()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'status' in update_fields:
+                update_fields.add('status_rank')
+            if 'priority' in update_fields:
+                update_fields.add('priority_rank')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -89,5 +155,89 @@ class Notification(models.Model):
     # Use a string 'Request' if the Request model is in this same file to avoid errors
     related_request = models.ForeignKey('Request', on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Header dropdown, inbox pages (keyset on -id) and the unread count,
+            # which is a range scan above the user's read watermark
+            models.Index(fields=['user', '-id'], name='notification_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user.username}"
+
+
+# ------------------------
+# Notification Read Watermark
+# ------------------------
+class NotificationWatermark(models.Model):
+    """
+    Per-user "read up to" marker. A notification is unread when its id is
+    above read_up_to and it was not marked read individually, so "mark all
+    read" is a write to this one row instead of an UPDATE over the backlog.
+    The row also carries the user's unread badge count (see
+    request_app.notifications).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_watermark')
+    read_up_to = models.BigIntegerField(default=0)
+    # None means "recount on the next read"
+    unread_count = models.PositiveIntegerField(null=True, blank=True)
+    unread_counted_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} read up to #{self.read_up_to}"
+
+
+# ------------------------
+# Notification Archive
+# ------------------------
+class NotificationArchive(models.Model):
+    """
+    Notifications moved out of the live table by the retention job. Keeps the
+    original id and text but drops the read flag and the request foreign key,
+    so archived rows put no load on the live table's indexes or on deletes.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    related_request_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived notification for {self.user_id}"
+
+
+# ------------------------
+# Request Stats Model
+# ------------------------
+class RequestStats(models.Model):
+    """
+    Denormalized request counters read by the dashboard header.
+    One row per user, plus a single global row (user=None) for staff.
+    Kept in sync by request_app.signals; rebuild with
+    `manage.py rebuild_request_stats`.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, related_name='request_stats')
+    total_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    # False until the counters were counted from the Request table under a
+    # lock on this row (see request_app.stats.seed)
+    seeded = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # A unique column still allows many NULLs, so index a constant
+            # over the NULL rows to keep the global row single
+            models.UniqueConstraint(
+                Coalesce('user', models.Value(0)),
+                condition=models.Q(user__isnull=True),
+                name='requeststats_single_global_row',
+            ),
+        ]
+
     def __str__(self):
-        return f"Notification for {self.user.username}"
\ No newline at end of file
+        return f"Request stats for {self.user.username if self.user_id else 'all users'}"
@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Notification, NotificationWatermark
+from .pagination import keyset_page
+
+# The unread badge count lives on the user's NotificationWatermark row, so
+# every worker reads the same value. It is recounted when cleared (None) and
+# at least this often, which bounds the drift from writes that bypass the
+# helpers below (admin deletes, shell updates).
+UNREAD_RECOUNT_INTERVAL = timedelta(hours=1)
+RECENT_LIMIT = 5
+INBOX_PAGE_SIZE = 20
+INBOX_ORDERING = ['-id']
+
+
+def read_up_to(user_id):
+    """The user's watermark as a scalar subquery (0 when they never marked all read)."""
+    watermark = NotificationWatermark.objects.filter(user_id=user_id).values('read_up_to')[:1]
+    return Coalesce(Subquery(watermark), Value(0))
+
+
+def unread_queryset(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False, id__gt=read_up_to(user_id))
+
+
+def with_unread_flag(queryset, user_id):
+    """Annotate `unread` in the same query, from is_read and the watermark."""
+    return queryset.annotate(unread=Case(
+        When(Q(is_read=False, id__gt=read_up_to(user_id)), then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    ))
+
+
+def unread_count(user_id):
+    """Unread badge count: a primary-key read of the counter row, recounted when stale."""
+    row = NotificationWatermark.objects.filter(user_id=user_id).values_list('unread_count', 'unread_counted_at').first()
+    if row and row[0] is not None and row[1] > timezone.now() - UNREAD_RECOUNT_INTERVAL:
+        return row[0]
+    return recount_unread(user_id)
+
+
+def unread_counts(user_ids):
+    """{user_id: unread count} for several users: one query, plus a recount per stale counter."""
+    fresh_after = timezone.now() - UNREAD_RECOUNT_INTERVAL
+    counts = {
+        user_id: count
+        for user_id, count, counted_at in NotificationWatermark.objects.filter(user_id__in=user_ids)
+        .values_list('user_id', 'unread_count', 'unread_counted_at')
+        if count is not None and counted_at > fresh_after
+    }
+    for user_id in user_ids:
+        if user_id not in counts:
+            counts[user_id] = recount_unread(user_id)
+    return counts
+
+
+def _ensure_counter_rows(user_ids):
+    # Created with no count, so a concurrent recount and increment always
+    # meet on an existing row lock (see recount_unread)
+    NotificationWatermark.objects.bulk_create(
+        [NotificationWatermark(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+    )
+
+
+def recount_unread(user_id):
+    """
+    COUNT the unread notifications above the watermark and store the result.
+    The counter row is locked first: an increment from a transaction that is
+    still open waits for it and lands on top of the count, and one that got
+    the lock first has committed its notification before the COUNT runs.
+    """
+    _ensure_counter_rows([user_id])
+    with transaction.atomic():
+        NotificationWatermark.objects.select_for_update().filter(user_id=user_id).values_list('user_id').first()
+        count = unread_queryset(user_id).count()
+        NotificationWatermark.objects.filter(user_id=user_id).update(
+            unread_count=count, unread_counted_at=timezone.now()
+        )
+    return count
+
+
+def _listing(user_id):
+    return with_unread_flag(
+        Notification.objects
+        .filter(user_id=user_id)
+        .only('id', 'message', 'is_read', 'created_at', 'related_request_id'),
+        user_id,
+    )
+
+
+def recent_notifications(user_id, limit=RECENT_LIMIT):
+    """The header dropdown in one query; templates link via related_request_id."""
+    return _listing(user_id).order_by(*INBOX_ORDERING)[:limit]
+
+
+def inbox_page(user_id, cursor=None, page_size=INBOX_PAGE_SIZE):
+    """One page of the user's notification history, newest first: (items, next_cursor)."""
+    return keyset_page(_listing(user_id), INBOX_ORDERING, cursor=cursor, page_size=page_size)
+
+
+def mark_all_read(user_id):
+    """
+    Move the user's watermark up to their newest notification: a single-row
+    write, however many notifications are unread. It only ever moves up, so
+    a slower concurrent call cannot bring back notifications already read.
+    The badge count is cleared and recounted (above the new watermark) on
+    the next read.
+    """
+    latest = (
+        Notification.objects.filter(user_id=user_id)
+        .order_by(*INBOX_ORDERING).values_list('id', flat=True).first()
+    )
+    if latest is None:
+        return
+
+    def advance():
+        return NotificationWatermark.objects.filter(user_id=user_id, read_up_to__lt=latest).update(
+            read_up_to=latest, unread_count=None, updated_at=timezone.now()
+        )
+
+    if not advance():
+        # No row yet, or it is already at or past `latest`. If a concurrent
+        # writer creates the row first the insert is skipped, so try again.
+        NotificationWatermark.objects.bulk_create(
+            [NotificationWatermark(user_id=user_id, read_up_to=latest)], ignore_conflicts=True
+        )
+        advance()
+
+
+def unread_added(counts):
+    """
+    Add {user_id: new unread notifications} to the stored counters, in the
+    caller's transaction so a rollback takes the increment with it. Counters
+    that are cleared stay cleared (None + n is None).
+    """
+    counts = {user_id: count for user_id, count in counts.items() if count}
+    if not counts:
+        return
+    _ensure_counter_rows(counts)
+    by_delta = {}
+    for user_id, count in counts.items():
+        by_delta.setdefault(count, []).append(user_id)
+    for count, user_ids in by_delta.items():
+        NotificationWatermark.objects.filter(user_id__in=user_ids).update(unread_count=F('unread_count') + count)
+
+
+def invalidate_unread(user_id):
+    """Clear the stored count; the next read recounts it."""
+    NotificationWatermark.objects.filter(user_id=user_id).update(unread_count=None)
@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj, keys):
+    """Encode the ordering values of the last row on a page as an opaque token."""
+    values = [getattr(obj, key.lstrip('-')) for key in keys]
+    # Full isoformat keeps microseconds, so ties on date are still resolved by id
+    raw = json.dumps(values, default=lambda value: value.isoformat(), separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _cursor_value(field, value):
+    """Check one decoded value against its ordering field; raises ValueError on a mismatch."""
+    if isinstance(field, models.DateTimeField):
+        # Datetimes come back as ISO strings
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+    if isinstance(field, models.IntegerField):
+        if isinstance(value, bool) or not isinstance(value, int) or not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(value)
+        return value
+    if isinstance(field, models.CharField):
+        if not isinstance(value, str):
+            raise ValueError(value)
+        return value
+    raise ValueError(f"Unsupported keyset field: {field.name}")
+
+
+def decode_cursor(token, keys, model):
+    """
+    Decode a cursor token for `model`; returns None for a missing, malformed
+    or tampered token (a value that does not fit its ordering field).
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(keys):
+        return None
+
+    try:
+        return [
+            _cursor_value(model._meta.get_field(key.lstrip('-')), value)
+            for key, value in zip(keys, values)
+        ]
+    except ValueError:
+        return None
+
+
+def keyset_filter(keys, values):
+    """
+    Build the "rows after this cursor" condition for an ordering such as
+    ['status_rank', 'priority_rank', '-date', '-id'].
+    """
+    condition = None
+    for key, value in reversed(list(zip(keys, values))):
+        field = key.lstrip('-')
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        after = Q(**{f'{field}__{lookup}': value})
+        if condition is not None:
+            after |= Q(**{field: value}) & condition
+        condition = after
+    return condition
+
+
+def keyset_page(queryset, keys, cursor=None, page_size=20):
+    """
+    Return (items, next_cursor) for one page of an ordered queryset.
+    The last key must be unique (e.g. the primary key) so the order is total.
+    """
+    queryset = queryset.order_by(*keys)
+    values = decode_cursor(cursor, keys, queryset.model)
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(keys, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1], keys)
+    return items, next_cursor
@@ -0,0 +1,118 @@
+"""
+Retention for in-app notifications.
+
+Read notifications older than NOTIFICATION_RETENTION_DAYS are removed, and
+so are unread ones older than NOTIFICATION_UNREAD_RETENTION_DAYS when that
+is set. A notification counts as read when is_read is set or its id is at or
+below the user's watermark (see notifications.mark_all_read).
+
+Rows are removed in id order, in short transactions of at most `batch_size`
+rows, so no lock is held for long. Each batch commits on its own, so an
+interrupted run loses nothing and the next run continues with the rows that
+are left.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import notifications
+from .models import Notification, NotificationArchive, NotificationWatermark
+
+BATCH_SIZE = 1000
+
+
+def cutoffs(now=None):
+    """(read_cutoff, unread_cutoff); unread_cutoff is None when unread notifications are kept."""
+    now = now or timezone.now()
+    read_cutoff = now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    unread_days = settings.NOTIFICATION_UNREAD_RETENTION_DAYS
+    unread_cutoff = now - timedelta(days=unread_days) if unread_days else None
+    return read_cutoff, unread_cutoff
+
+
+def expired_notifications(now=None):
+    read_cutoff, unread_cutoff = cutoffs(now)
+    watermark = NotificationWatermark.objects.filter(user_id=OuterRef('user_id')).values('read_up_to')[:1]
+    is_read = Q(is_read=True) | Q(id__lte=Coalesce(Subquery(watermark), Value(0)))
+
+    expired = Q(created_at__lt=read_cutoff) & is_read
+    if unread_cutoff is not None:
+        expired |= Q(created_at__lt=unread_cutoff)
+    return Notification.objects.filter(expired)
+
+
+def newest_candidate_id(now=None):
+    """
+    Highest id old enough to expire under either cutoff. Ids grow with
+    created_at, so the batches only walk the primary key up to here.
+    """
+    read_cutoff, unread_cutoff = cutoffs(now)
+    oldest_kept = max(read_cutoff, unread_cutoff) if unread_cutoff else read_cutoff
+    return (
+        Notification.objects.filter(created_at__lt=oldest_kept)
+        .order_by('-id').values_list('id', flat=True).first()
+    )
+
+
+def purge_batch(after_id, up_to_id, batch_size=BATCH_SIZE, archive=False, now=None):
+    """
+    Remove one batch of expired notifications with ids in (after_id, up_to_id].
+    Returns (removed, last_id scanned); last_id is None when nothing is left.
+    """
+    with transaction.atomic():
+        rows = list(
+            expired_notifications(now)
+            .filter(id__gt=after_id, id__lte=up_to_id)
+            .order_by('id')
+            .values('id', 'user_id', 'message', 'is_read', 'related_request_id', 'created_at')[:batch_size]
+        )
+        if not rows:
+            return 0, None
+
+        if archive:
+            NotificationArchive.objects.bulk_create([
+                NotificationArchive(
+                    id=row['id'],
+                    user_id=row['user_id'],
+                    message=row['message'],
+                    related_request_id=row['related_request_id'],
+                    created_at=row['created_at'],
+                )
+                for row in rows
+            ], ignore_conflicts=True)
+
+        Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        # Removing a row that still looked unread changes that user's badge
+        for user_id in {row['user_id'] for row in rows if not row['is_read']}:
+            notifications.invalidate_unread(user_id)
+
+    return len(rows), rows[-1]['id']
+
+
+def purge_expired(batch_size=BATCH_SIZE, archive=False, after_id=0, max_batches=None, on_batch=None, now=None):
+    """
+    Run purge_batch until nothing expired is left (or max_batches ran).
+    on_batch(removed, last_id) is called after each committed batch.
+    Returns the total number of rows removed.
+    """
+    now = now or timezone.now()
+    up_to_id = newest_candidate_id(now)
+    if up_to_id is None:
+        return 0
+
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        removed, last_id = purge_batch(after_id, up_to_id, batch_size, archive, now)
+        if last_id is None:
+            break
+        total += removed
+        batches += 1
+        after_id = last_id
+        if on_batch:
+            on_batch(removed, last_id)
+    return total
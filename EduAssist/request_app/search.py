@@ -0,0 +1,101 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+FTS_TABLE = 'request_app_request_fts'
+
+# SQLite (local/dev) fallback: an external-content FTS5 table over
+# request_app_request kept in sync by triggers. Installed from post_migrate
+# because SQLite drops triggers whenever a migration rebuilds the table.
+SQLITE_FTS_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='request_app_request', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON request_app_request BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON request_app_request BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON request_app_request BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+_sqlite_fts_available = None
+
+
+def search_terms(query):
+    """Split a user query into plain word terms (no operators reach the engine)."""
+    return re.findall(r'\w+', query or '')
+
+
+def sqlite_fts_available():
+    """True when the SQLite build has FTS5 and the index table is installed."""
+    global _sqlite_fts_available
+    if _sqlite_fts_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+            _sqlite_fts_available = cursor.fetchone() is not None
+    return _sqlite_fts_available
+
+
+def install_sqlite_fts(using_connection):
+    """Create the FTS5 table and triggers; rebuild the index if triggers were missing."""
+    global _sqlite_fts_available
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{FTS_TABLE}_%'],
+        )
+        had_triggers = cursor.fetchone()[0] == 3
+        try:
+            for statement in SQLITE_FTS_STATEMENTS:
+                cursor.execute(statement)
+        except Exception:
+            # SQLite compiled without FTS5: searches fall back to icontains
+            _sqlite_fts_available = False
+            return
+        if not had_triggers:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _sqlite_fts_available = True
+
+
+def search_requests(queryset, query):
+    """
+    Filter a Request queryset by full-text match on title and description.
+    Every term must match, the last one as a prefix (search-as-you-type).
+    Matches are annotated with `search_rank` (higher is better).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == 'postgresql':
+        tsquery = SearchQuery(
+            ' & '.join(terms[:-1] + [f'{terms[-1]}:*']), search_type='raw', config='english'
+        )
+        return queryset.filter(search_vector=tsquery).annotate(
+            search_rank=SearchRank(F('search_vector'), tsquery)
+        )
+
+    if connection.vendor == 'sqlite' and sqlite_fts_available():
+        match = ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+        # Join the FTS table once so MATCH drives the query; bm25() is
+        # lower-is-better, so negate it to match SearchRank.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = request_app_request.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={'search_rank': f"-bm25({FTS_TABLE}, 2.0, 1.0)"},
+        )
+
+    # No full-text engine available: unranked substring match
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,107 @@
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Category, CategoryChoice, Notification, Request, Tag
+from . import catalog, notifications, search, stats, tagging
+from .tag_index import tag_index
+
+
+@receiver(post_init, sender=Request)
+def remember_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field is never fetched here.
+    instance._stats_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Request)
+def update_stats_on_save(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    if created:
+        stats.apply_delta(instance.user_id, new_status=instance.status, total=1)
+    elif instance._stats_status is not None:
+        stats.apply_delta(instance.user_id, old_status=instance._stats_status, new_status=instance.status)
+    instance._stats_status = instance.status
+
+
+@receiver(post_delete, sender=Request)
+def update_stats_on_delete(sender, instance, **kwargs):
+    stats.apply_delta(instance.user_id, old_status=instance.status, total=-1)
+
+
+@receiver(post_save, sender=Tag)
+def index_tag(sender, instance, created, **kwargs):
+    if created:
+        tag_index.add(instance.id, instance.name, instance.slug)
+    else:
+        # Renames are rare; rebuild lazily instead of patching the index
+        tag_index.invalidate()
+
+
+@receiver(post_delete, sender=Tag)
+def unindex_tag(sender, instance, **kwargs):
+    tag_index.remove(instance.id)
+
+
+@receiver(m2m_changed, sender=Request.tags.through)
+def update_tag_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # The cleared ids are gone by post_clear, so remember them now
+        if reverse:
+            instance._cleared_tag_usage = {instance.id: -instance.requests.count()}
+        else:
+            instance._cleared_tag_usage = {tag_id: -1 for tag_id in instance.tags.values_list('id', flat=True)}
+        return
+
+    if action == 'post_clear':
+        tagging.apply_usage_deltas(getattr(instance, '_cleared_tag_usage', {}))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        delta = 1 if action == 'post_add' else -1
+        if reverse:
+            tagging.apply_usage_deltas({instance.id: delta * len(pk_set)})
+        else:
+            tagging.apply_usage_deltas({tag_id: delta for tag_id in pk_set})
+
+
+@receiver(pre_delete, sender=Request)
+def release_tag_usage(sender, instance, **kwargs):
+    # Link rows are removed by cascade without an m2m_changed signal
+    tag_ids = list(instance.tags.values_list('id', flat=True))
+    if tag_ids:
+        tagging.apply_usage_deltas({tag_id: -1 for tag_id in tag_ids})
+
+
+@receiver(pre_delete, sender=Request)
+def forget_unread_notifications(sender, instance, **kwargs):
+    # The request's notifications go with it by cascade (no per-row signals)
+    notifications.invalidate_unread(instance.user_id)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+
+    if created:
+        if not instance.is_read:
+            notifications.unread_added({instance.user_id: 1})
+    else:
+        notifications.invalidate_unread(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=CategoryChoice)
+@receiver(post_delete, sender=CategoryChoice)
+def invalidate_catalog(sender, **kwargs):
+    # Same transaction as the edit: other workers see the new stamp and the
+    # new rows together, and a rolled-back edit rolls the stamp back too
+    catalog.bump_version()
+
+
+def install_search_index(sender, using, **kwargs):
+    # PostgreSQL gets its tsvector trigger from migration 0005.
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        search.install_sqlite_fts(connection)
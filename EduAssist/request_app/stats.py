@@ -0,0 +1,140 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Request, RequestStats
+
+# Counter columns on RequestStats, keyed by the status they track.
+STATUS_FIELDS = {
+    'pending': 'pending_count',
+    'approved': 'approved_count',
+    'cancelled': 'cancelled_count',
+}
+COUNTER_FIELDS = ('total_count', 'pending_count', 'approved_count', 'cancelled_count')
+
+
+def aggregate_counts(queryset):
+    """
+    Count every counter column with a single conditional-aggregation query.
+    Used to seed a missing stats row and by the rebuild command.
+    """
+    return queryset.aggregate(
+        total_count=Count('id'),
+        pending_count=Count('id', filter=Q(status='pending')),
+        approved_count=Count('id', filter=Q(status='approved')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+    )
+
+
+def _source_queryset(user_id):
+    if user_id is None:
+        return Request.objects.all()
+    return Request.objects.filter(user_id=user_id)
+
+
+def get_stats(user_id):
+    """
+    Return the stats row for a user (or the global row for None).
+    Normally one indexed read; a missing or unseeded row is counted once.
+    """
+    stats = RequestStats.objects.filter(user_id=user_id).first()
+    if stats is not None and stats.seeded:
+        return stats
+    return seed(user_id)
+
+
+def seed(user_id, force=False):
+    """
+    Count a stats row from the Request table. The row is created (empty) and
+    committed first, then locked for the count: a concurrent apply_delta
+    either updated it before the lock, so its request committed before the
+    count, or waits for the lock and adds its change on top of the count.
+    """
+    RequestStats.objects.get_or_create(user_id=user_id)
+    with transaction.atomic():
+        stats = RequestStats.objects.select_for_update().get(user_id=user_id)
+        if force or not stats.seeded:
+            for field, value in aggregate_counts(_source_queryset(user_id)).items():
+                setattr(stats, field, value)
+            stats.seeded = True
+            stats.save()
+    return stats
+
+
+def dashboard_counts(user):
+    """Counts shown in the dashboard header (total excludes cancelled requests)."""
+    stats = get_stats(None if user.is_staff else user.id)
+    return {
+        'total_count': stats.total_count - stats.cancelled_count,
+        'pending_count': stats.pending_count,
+        'approved_count': stats.approved_count,
+    }
+
+
+def apply_delta(user_id, old_status=None, new_status=None, total=0):
+    """
+    Adjust the user's row and the global row for one request change.
+    Only existing rows are touched; missing rows are seeded on first read
+    (see seed for how the two meet).
+    """
+    changes = {}
+    if total:
+        changes['total_count'] = F('total_count') + total
+    if old_status != new_status:
+        if old_status in STATUS_FIELDS:
+            changes[STATUS_FIELDS[old_status]] = F(STATUS_FIELDS[old_status]) - 1
+        if new_status in STATUS_FIELDS:
+            changes[STATUS_FIELDS[new_status]] = F(STATUS_FIELDS[new_status]) + 1
+    if not changes:
+        return
+
+    RequestStats.objects.filter(Q(user_id=user_id) | Q(user__isnull=True)).update(**changes)
+
+
+def apply_deltas(changes):
+    """
+    Bulk form of apply_delta for (user_id, old_status, new_status) status changes,
+    e.g. after a queryset.update() that bypassed the signals. Users with the same
+    net change share one UPDATE, plus one UPDATE for the global row.
+    """
+    per_user = defaultdict(lambda: defaultdict(int))
+    for user_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status in STATUS_FIELDS:
+            per_user[user_id][STATUS_FIELDS[old_status]] -= 1
+        if new_status in STATUS_FIELDS:
+            per_user[user_id][STATUS_FIELDS[new_status]] += 1
+
+    groups = defaultdict(list)
+    overall = defaultdict(int)
+    for user_id, deltas in per_user.items():
+        key = tuple(sorted((field, delta) for field, delta in deltas.items() if delta))
+        if key:
+            groups[key].append(user_id)
+        for field, delta in key:
+            overall[field] += delta
+
+    for key, user_ids in groups.items():
+        RequestStats.objects.filter(user_id__in=user_ids).update(
+            **{field: F(field) + delta for field, delta in key}
+        )
+    if any(overall.values()):
+        RequestStats.objects.filter(user__isnull=True).update(
+            **{field: F(field) + delta for field, delta in overall.items() if delta}
+        )
+
+
+def rebuild(user_id=None, fix=True):
+    """
+    Recount one stats row from the Request table.
+    Returns (expected, stored) counter dicts; stored is None for a missing row.
+    """
+    stats = RequestStats.objects.filter(user_id=user_id).first()
+    stored = {field: getattr(stats, field) for field in COUNTER_FIELDS} if stats else None
+    if not fix:
+        return aggregate_counts(_source_queryset(user_id)), stored
+
+    stats = seed(user_id, force=True)
+    return {field: getattr(stats, field) for field in COUNTER_FIELDS}, stored
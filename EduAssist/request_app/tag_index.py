@@ -0,0 +1,103 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left
+
+from .models import Tag
+
+# Usage changes made by other worker processes only reach this process's
+# index through a rebuild from Tag.usage_count, done at most this often.
+REBUILD_INTERVAL = 300
+
+MAX_CACHED_PREFIXES = 1024
+
+# Highest Unicode code point; appended to a prefix it bounds the bisect range.
+_PREFIX_END = '\U0010ffff'
+
+
+class TagIndex:
+    """
+    Per-process prefix index over Tag.name for the autosuggest endpoint.
+    Names live in a sorted list searched with bisect; matches are ranked by
+    how many requests use the tag. Lookups never touch the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = []
+        self._tags = {}      # name -> {'name', 'slug', 'usage'}
+        self._ids = {}       # tag id -> name
+        self._cache = {}     # prefix -> ranked suggestions
+        self._built_at = None
+
+    def rebuild(self):
+        rows = Tag.objects.values_list('id', 'name', 'slug', 'usage_count')
+        tags = {name: {'name': name, 'slug': slug, 'usage': usage} for _id, name, slug, usage in rows}
+        with self._lock:
+            self._tags = tags
+            self._ids = {tag_id: name for tag_id, name, _slug, _usage in rows}
+            self._names = sorted(tags)
+            self._cache = {}
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        if self._built_at is None or time.monotonic() - self._built_at > REBUILD_INTERVAL:
+            self.rebuild()
+
+    def suggest(self, prefix, limit=10):
+        prefix = prefix.strip().lower()
+        self._ensure_fresh()
+        key = (prefix, limit)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            names = self._names
+            start = bisect_left(names, prefix)
+            end = bisect_left(names, prefix + _PREFIX_END, lo=start)
+            matches = (self._tags[name] for name in names[start:end])
+            # Most used first, then alphabetical
+            result = [
+                dict(tag) for tag in heapq.nsmallest(limit, matches, key=lambda tag: (-tag['usage'], tag['name']))
+            ]
+            if len(self._cache) >= MAX_CACHED_PREFIXES:
+                self._cache = {}
+            self._cache[key] = result
+        return result
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup (e.g. after a tag rename)."""
+        self._built_at = None
+
+    def add(self, tag_id, name, slug):
+        """Insert a newly created tag without rebuilding."""
+        with self._lock:
+            if self._built_at is None or name in self._tags:
+                return
+            self._tags[name] = {'name': name, 'slug': slug, 'usage': 0}
+            self._ids[tag_id] = name
+            self._names.insert(bisect_left(self._names, name), name)
+            self._cache = {}
+
+    def remove(self, tag_id):
+        with self._lock:
+            name = self._ids.pop(tag_id, None)
+            if name is not None and self._tags.pop(name, None) is not None:
+                self._names.pop(bisect_left(self._names, name))
+                self._cache = {}
+
+    def adjust_usage(self, counts):
+        """Apply {tag id: usage delta} from request/tag link changes."""
+        with self._lock:
+            changed = False
+            for tag_id, delta in counts.items():
+                tag = self._tags.get(self._ids.get(tag_id))
+                if tag is not None and delta:
+                    tag['usage'] = max(tag['usage'] + delta, 0)
+                    changed = True
+            if changed:
+                self._cache = {}
+
+
+tag_index = TagIndex()
@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+from django.utils.text import slugify
+
+from .models import Tag
+from .tag_index import tag_index
+
+
+def parse_tag_names(tags_input):
+    """Split the comma-separated tags field into unique, lowercased names (order kept)."""
+    names = [t.strip().lower() for t in (tags_input or '').split(',') if t.strip()]
+    return list(dict.fromkeys(names))
+
+
+def resolve_tags(names):
+    """
+    Return Tag objects for the given names, creating the missing ones.
+    One SELECT for existing tags; missing tags are created with a single
+    INSERT that ignores rows a concurrent submission created first, then
+    read back with one more SELECT.
+    """
+    if not names:
+        return []
+
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+
+    if missing:
+        # bulk_create skips Tag.save(), so normalize the same way here
+        slugs = {name: slugify(name) for name in missing}
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugs[name]) for name in missing],
+            ignore_conflicts=True,
+        )
+        created = list(Tag.objects.filter(Q(name__in=missing) | Q(slug__in=slugs.values())))
+        by_name = {tag.name: tag for tag in created}
+        by_slug = {tag.slug: tag for tag in created}
+        for tag in created:
+            tag_index.add(tag.id, tag.name, tag.slug)
+        for name in missing:
+            # A name whose slug collides with an existing tag maps to that tag
+            tag = by_name.get(name) or by_slug.get(slugs[name])
+            if tag is not None:
+                tags[name] = tag
+
+    return [tags[name] for name in names if name in tags]
+
+
+def set_request_tags(req, names, current_ids=None):
+    """
+    Make req's tags exactly `names`, touching only the link rows that change.
+    Returns True if any link was added or removed.
+    """
+    wanted = {tag.id: tag for tag in resolve_tags(names)}
+    if current_ids is None:
+        current_ids = set(req.tags.values_list('id', flat=True))
+
+    to_add = [tag for tag_id, tag in wanted.items() if tag_id not in current_ids]
+    to_remove = [tag_id for tag_id in current_ids if tag_id not in wanted]
+
+    if to_add:
+        req.tags.add(*to_add)
+    if to_remove:
+        req.tags.remove(*to_remove)
+    return bool(to_add or to_remove)
+
+
+def apply_usage_deltas(deltas):
+    """
+    Apply {tag id: change} to Tag.usage_count (one UPDATE per distinct change)
+    and to the autosuggest index.
+    """
+    by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        Tag.objects.filter(id__in=sorted(tag_ids)).update(usage_count=F('usage_count') + delta)
+    tag_index.adjust_usage(deltas)
+
+
+def reconcile_usage_counts(fix=True):
+    """
+    Compare Tag.usage_count with the request/tag link table.
+    Returns [(tag, stored, actual)] for drifted tags, correcting them unless fix=False.
+    """
+    drifted = [
+        (tag, tag.usage_count, tag.actual)
+        for tag in Tag.objects.annotate(actual=Count('requests')).order_by('id')
+        if tag.usage_count != tag.actual
+    ]
+    if fix and drifted:
+        for tag, _stored, actual in drifted:
+            tag.usage_count = actual
+        Tag.objects.bulk_update([tag for tag, _stored, _actual in drifted], ['usage_count'], batch_size=500)
+        tag_index.invalidate()
+    return drifted
@@ -1,3 +1,1093 @@
-from django.test import TestCase
+from datetime import timedelta
+import base64
+import json
+import time
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from eduassist_app.models import EmailOutbox
+
+from . import catalog, stats
+from .broadcast import NotificationBroadcaster, broadcaster
+from .context_processors import user_notifications
+from .filters import filter_requests
+from .models import CatalogVersion, Category, CategoryChoice, Notification, NotificationArchive, NotificationWatermark, Request, RequestStats, Tag
+from .notifications import inbox_page, mark_all_read, recent_notifications, unread_count, unread_queryset
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .retention import purge_expired
+from .search import FTS_TABLE, install_sqlite_fts, search_requests, sqlite_fts_available
+from .tag_index import tag_index
+from .tagging import parse_tag_names, resolve_tags, set_request_tags
+from .transitions import bulk_transition
+from .views import DASHBOARD_ORDERING, DASHBOARD_PAGE_SIZE, RequestListView, dashboard_queryset
+
+
+class RequestStatsTests(TestCase):
+    """The dashboard counters follow request saves, status changes and deletes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.other = User.objects.create_user('other', 'other@cit.edu', 'x')
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+
+    def counters(self, user_id):
+        row = RequestStats.objects.get(user_id=user_id)
+        return {field: getattr(row, field) for field in stats.COUNTER_FIELDS}
+
+    def test_signals_keep_rows_in_step(self):
+        # Rows are seeded from the table on first read, then maintained by the signals
+        stats.get_stats(self.student.id)
+        stats.get_stats(None)
+        first = Request.objects.create(user=self.student, title="A", description="x")
+        second = Request.objects.create(user=self.student, title="B", description="x")
+        Request.objects.create(user=self.other, title="C", description="x")
+
+        first.status = 'approved'
+        first.save()
+        second.status = 'cancelled'
+        second.save(update_fields=['status'])
+        Request.objects.get(id=first.id).delete()
+
+        self.assertEqual(self.counters(self.student.id),
+                         {'total_count': 1, 'pending_count': 0, 'approved_count': 0, 'cancelled_count': 1})
+        self.assertEqual(self.counters(None),
+                         {'total_count': 2, 'pending_count': 1, 'approved_count': 0, 'cancelled_count': 1})
+
+    def test_dashboard_counts(self):
+        Request.objects.create(user=self.student, title="A", description="x", status='approved')
+        Request.objects.create(user=self.student, title="B", description="x", status='cancelled')
+        Request.objects.create(user=self.other, title="C", description="x")
+
+        self.assertEqual(stats.dashboard_counts(self.student),
+                         {'total_count': 1, 'pending_count': 0, 'approved_count': 1})
+        self.assertEqual(stats.dashboard_counts(self.staff),
+                         {'total_count': 2, 'pending_count': 1, 'approved_count': 1})
+        with self.assertNumQueries(1):
+            stats.dashboard_counts(self.staff)
+
+    def test_single_global_row(self):
+        stats.get_stats(None)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RequestStats.objects.create(user=None)
+
+        # A concurrent first read that finds the row already seeded uses it as is
+        with mock.patch.object(RequestStats.objects, 'filter', return_value=RequestStats.objects.none()):
+            with mock.patch.object(stats, 'aggregate_counts') as aggregate:
+                row = stats.get_stats(None)
+        aggregate.assert_not_called()
+        self.assertEqual(row, RequestStats.objects.get(user=None))
+
+    def test_seed_counts_with_the_row_in_place(self):
+        count = stats.aggregate_counts
+
+        def count_after_a_concurrent_create(queryset):
+            # The row already exists, so this request's delta reaches it
+            self.assertTrue(RequestStats.objects.filter(user_id=self.student.id).exists())
+            Request.objects.create(user=self.student, title="Racing", description="x")
+            return count(queryset)
+
+        with mock.patch.object(stats, 'aggregate_counts', side_effect=count_after_a_concurrent_create):
+            stats.get_stats(self.student.id)
+        Request.objects.create(user=self.student, title="Later", description="x")
+        self.assertEqual(self.counters(self.student.id)['total_count'], 2)
+
+    def test_unseeded_row_is_counted_on_read(self):
+        # A row created by a delta or an interrupted seed holds no real counts yet
+        Request.objects.create(user=self.student, title="A", description="x")
+        RequestStats.objects.create(user=self.student, total_count=7)
+        self.assertEqual(stats.get_stats(self.student.id).total_count, 1)
+        self.assertTrue(RequestStats.objects.get(user=self.student).seeded)
+
+    def test_rebuild_command_repairs_drift(self):
+        Request.objects.create(user=self.student, title="A", description="x")
+        stats.get_stats(self.student.id)
+        stats.get_stats(None)
+        RequestStats.objects.update(total_count=99)
+
+        out = StringIO()
+        call_command('rebuild_request_stats', '--verify', stdout=out)
+        self.assertIn("2 out of sync", out.getvalue())
+        self.assertEqual(RequestStats.objects.get(user=None).total_count, 99)
+
+        call_command('rebuild_request_stats', stdout=StringIO())
+        self.assertEqual(self.counters(self.student.id)['total_count'], 1)
+        self.assertEqual(self.counters(None)['total_count'], 1)
+
+
+class KeysetPaginationTests(TestCase):
+    """keyset_page walks every row exactly once and treats bad cursors as the first page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+        Request.objects.bulk_create([
+            Request(user=cls.student, title=f"R{i}", description="x", status_rank=1, priority_rank=2)
+            for i in range(25)
+        ])
+        # Identical sort keys everywhere except the id tie-breaker
+        Request.objects.update(date=timezone.now())
+
+    def token(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def test_pages_are_stable_across_equal_sort_keys(self):
+        seen, cursor = [], None
+        while True:
+            items, cursor = keyset_page(Request.objects.all(), DASHBOARD_ORDERING, cursor=cursor, page_size=7)
+            seen += [req.id for req in items]
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(Request.objects.order_by('-id').values_list('id', flat=True)))
+        self.assertEqual(len(items), 25 % 7)
+
+    def test_last_page_has_no_cursor(self):
+        items, cursor = keyset_page(Request.objects.all(), DASHBOARD_ORDERING, page_size=25)
+        self.assertEqual((len(items), cursor), (25, None))
+        last = encode_cursor(items[-1], DASHBOARD_ORDERING)
+        self.assertEqual(keyset_page(Request.objects.all(), DASHBOARD_ORDERING, cursor=last), ([], None))
+
+    def test_malformed_or_tampered_cursor_is_ignored(self):
+        valid = decode_cursor(encode_cursor(Request.objects.first(), DASHBOARD_ORDERING), DASHBOARD_ORDERING, Request)
+        self.assertIsNotNone(valid)
+        date = timezone.now().isoformat()
+        for token in [
+            'not base64!', self.token({'a': 1}), self.token([1, 2, date]),
+            self.token([{'a': 1}, 2, date, 3]), self.token([1, 2, 'yesterday', 3]),
+            self.token([1, True, date, 3]), self.token(['1', 2, date, 3]), self.token([1, 2, date, 2 ** 64]),
+        ]:
+            self.assertIsNone(decode_cursor(token, DASHBOARD_ORDERING, Request), token)
+
+    def test_views_answer_tampered_cursors(self):
+        self.client.force_login(self.staff)
+        Profile.objects.filter(user=self.staff).update(role='ADMIN')
+        response = self.client.get(reverse('admin_dashboard'), {'cursor': self.token([{'a': 1}])})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('dashboard_more'), {'cursor': self.token([{'a': 1}, 1, 1, 1])})
+        self.assertEqual(response.status_code, 200)
+
+
+class CategoryCatalogTests(TestCase):
+    """The category catalog is revalidated by ETag and refreshed after committed edits only."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.category = Category.objects.create(name="Registrar")
+        cls.choice = CategoryChoice.objects.create(category=cls.category, value="Transcript")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def fetch(self, **headers):
+        return self.client.get(reverse('category_catalog'), headers=headers)
+
+    def test_etag_and_not_modified(self):
+        response = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['categories'][0]['choices'][0]['value'], "Transcript")
+        self.assertEqual(self.fetch(if_none_match=response['ETag']).status_code, 304)
+
+    def test_edits_change_the_etag(self):
+        etag = self.fetch()['ETag']
+        CategoryChoice.objects.create(category=self.category, value="Diploma")
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['value'] for c in response.json()['categories'][0]['choices']], ["Transcript", "Diploma"])
+
+        etag = response['ETag']
+        Category.objects.filter(id=self.category.id).first().delete()
+        response = self.fetch(if_none_match=etag)
+        self.assertEqual(response.json(), {'categories': []})
+
+    def test_version_is_shared_through_the_database(self):
+        catalog.get_catalog()
+        version = catalog.get_version()
+        # Another worker's edit: nothing in this process's cache changes
+        CatalogVersion.objects.filter(id=catalog.CATALOG_VERSION_ID).update(version=F('version') + 1)
+        Category.objects.bulk_create([Category(name="Library")])
+        cache.clear()
+
+        self.assertEqual(catalog.get_version(), version + 1)
+        self.assertEqual([c['name'] for c in catalog.get_catalog()['categories']], ["Library", "Registrar"])
+
+    def test_rolled_back_edit_keeps_the_version(self):
+        version = catalog.get_version()
+        try:
+            with transaction.atomic():
+                self.category.name = "Renamed"
+                self.category.save()
+                self.assertEqual(catalog.get_version(), version + 1)
+                raise IntegrityError
+        except IntegrityError:
+            pass
+        self.assertEqual(catalog.get_version(), version)
+
+    def test_add_request_drops_unknown_category_ids(self):
+        self.client.post(reverse('add_request'), {
+            'title': "Known", 'description': "x", 'priority': 'low',
+            'category': self.category.id, 'category_choice': self.choice.id,
+        })
+        self.client.post(reverse('add_request'), {
+            'title': "Unknown", 'description': "x", 'priority': 'low',
+            'category': 9999, 'category_choice': 'abc',
+        })
+        known = Request.objects.get(title="Known")
+        unknown = Request.objects.get(title="Unknown")
+        self.assertEqual((known.category_id, known.category_choice_id), (self.category.id, self.choice.id))
+        self.assertEqual((unknown.category_id, unknown.category_choice_id), (None, None))
+
+    def test_add_request_reloads_a_stale_catalog(self):
+        catalog.get_catalog()
+        # Rows this worker's copy has not seen, without a version bump
+        library = Category.objects.bulk_create([Category(name="Library")])[0]
+        CategoryChoice.objects.bulk_create([CategoryChoice(category=library, value="Book loan")])
+        choice = CategoryChoice.objects.get(value="Book loan")
+
+        self.client.post(reverse('add_request'), {
+            'title': "Book", 'description': "x", 'priority': 'low',
+            'category': library.id, 'category_choice': choice.id,
+        })
+        req = Request.objects.get(title="Book")
+        self.assertEqual((req.category_id, req.category_choice_id), (library.id, choice.id))
+
+
+class TaggingTests(TestCase):
+    """Tags are resolved and linked with a fixed number of queries, and edits only write what changed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        Tag.objects.bulk_create([Tag(name=f"old{i}", slug=f"old{i}") for i in range(12)])
+
+    def setUp(self):
+        tag_index.rebuild()
+
+    def tag_request(self, names):
+        req = Request.objects.create(user=self.student, title="Tagged", description="x")
+        with CaptureQueriesContext(connection) as queries:
+            set_request_tags(req, names, current_ids=set())
+        return req, len(queries)
+
+    def test_query_count_is_constant_in_the_number_of_tags(self):
+        small, few = self.tag_request(['old0', 'new0', 'new1'])
+        large, many = self.tag_request([f"old{i}" for i in range(1, 12)] + [f"new{i}" for i in range(2, 20)])
+        self.assertEqual(few, many)
+        self.assertEqual(small.tags.count(), 3)
+        self.assertEqual(large.tags.count(), 29)
+
+    def test_names_are_normalized_and_deduplicated(self):
+        self.assertEqual(parse_tag_names(" Math, math ,MATH,, Physics "), ['math', 'physics'])
+        tags = resolve_tags(parse_tag_names("Math, math, Physics"))
+        self.assertEqual([tag.name for tag in tags], ['math', 'physics'])
+        self.assertEqual(Tag.objects.filter(name__in=['math', 'physics']).count(), 2)
+
+    def test_title_only_edit_writes_title_and_nothing_else(self):
+        req, _queries = self.tag_request(['old0', 'old1'])
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('edit_request', args=[req.id]), {
+                'title': "Renamed", 'status': req.status, 'priority': req.priority,
+                'description': req.description, 'tags': "old1, OLD0",
+            })
+
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        request_updates = [sql for sql in writes if sql.startswith('UPDATE "request_app_request" ')]
+        self.assertEqual(len(request_updates), 1)
+        set_clause = request_updates[0].split(' WHERE ')[0]
+        self.assertIn('"title"', set_clause)
+        self.assertIn('"updated_at"', set_clause)
+        self.assertNotIn('"description"', set_clause)
+        self.assertFalse([sql for sql in writes if 'request_app_request_tags' in sql])
+        self.assertEqual(Request.objects.get(id=req.id).title, "Renamed")
+
+
+class TagUsageCountTests(TestCase):
+    """Tag.usage_count follows every way links are added or removed, and the reconcile command repairs drift."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.math, cls.physics, cls.art = [Tag.objects.create(name=name) for name in ('math', 'physics', 'art')]
+
+    def setUp(self):
+        self.first = Request.objects.create(user=self.student, title="First", description="x")
+        self.second = Request.objects.create(user=self.student, title="Second", description="x")
+
+    def assertCountsMatchLinks(self):
+        for tag in Tag.objects.annotate(links=Count('requests')):
+            self.assertEqual(tag.usage_count, tag.links, tag.name)
+
+    def test_add_remove_clear_and_set(self):
+        self.first.tags.add(self.math, self.physics)
+        self.second.tags.add(self.math)
+        self.assertCountsMatchLinks()
+        self.assertEqual(Tag.objects.get(id=self.math.id).usage_count, 2)
+
+        self.first.tags.remove(self.physics)
+        self.assertCountsMatchLinks()
+
+        self.first.tags.set([self.physics, self.art])
+        self.assertCountsMatchLinks()
+
+        self.first.tags.clear()
+        self.assertCountsMatchLinks()
+        self.assertEqual(Tag.objects.get(id=self.math.id).usage_count, 1)
+
+    def test_reverse_side_changes(self):
+        self.math.requests.add(self.first, self.second)
+        self.assertCountsMatchLinks()
+
+        self.math.requests.remove(self.second)
+        self.assertCountsMatchLinks()
+
+        self.first.tags.add(self.physics)
+        self.math.requests.clear()
+        self.assertCountsMatchLinks()
+        self.assertEqual(Tag.objects.get(id=self.math.id).usage_count, 0)
+        self.assertEqual(Tag.objects.get(id=self.physics.id).usage_count, 1)
+
+    def test_deleting_a_request_releases_its_tags(self):
+        self.first.tags.add(self.math, self.physics)
+        self.second.tags.add(self.math)
+        self.first.delete()
+        self.assertCountsMatchLinks()
+        self.assertEqual(Tag.objects.get(id=self.math.id).usage_count, 1)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.first.tags.add(self.math)
+        Tag.objects.filter(id=self.math.id).update(usage_count=7)
+
+        out = StringIO()
+        call_command('reconcile_tag_usage', '--verify', stdout=out)
+        self.assertIn("math: stored=7 actual=1", out.getvalue())
+        self.assertEqual(Tag.objects.get(id=self.math.id).usage_count, 7)
+
+        call_command('reconcile_tag_usage', stdout=StringIO())
+        self.assertCountsMatchLinks()
+
+
+class RequestFilterTests(TestCase):
+    """Tag filters use EXISTS: 'any' is OR, 'all' is AND, and no request is listed twice."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        math, physics, art = [Tag.objects.create(name=name) for name in ('math', 'physics', 'art')]
+        cls.both = Request.objects.create(user=cls.student, title="Both", description="x", priority='high')
+        cls.both.tags.add(math, physics)
+        cls.math_only = Request.objects.create(user=cls.student, title="Math", description="x", status='approved')
+        cls.math_only.tags.add(math)
+        cls.art_only = Request.objects.create(user=cls.student, title="Art", description="x")
+        cls.art_only.tags.add(art)
+        cls.untagged = Request.objects.create(user=cls.student, title="None", description="x")
+
+    def titles(self, **filters):
+        return sorted(filter_requests(Request.objects.all(), **filters).values_list('title', flat=True))
+
+    def test_any_mode_is_or(self):
+        self.assertEqual(self.titles(tags=['math', 'physics']), ["Both", "Math"])
+        self.assertEqual(self.titles(tags=['physics', 'art']), ["Art", "Both"])
+
+    def test_all_mode_is_and(self):
+        self.assertEqual(self.titles(tags=['math', 'physics'], tag_mode='all'), ["Both"])
+        self.assertEqual(self.titles(tags=['math', 'art'], tag_mode='all'), [])
+
+    def test_several_matching_tags_do_not_duplicate_rows(self):
+        queryset = filter_requests(Request.objects.all(), tags=['math', 'physics', 'math'])
+        self.assertEqual(queryset.count(), 2)
+        self.assertEqual(len(list(queryset)), 2)
+        self.assertNotIn('DISTINCT', str(queryset.query))
+
+    def test_tags_combine_with_status_and_priority(self):
+        self.assertEqual(self.titles(tags=['math'], statuses=['approved']), ["Math"])
+        self.assertEqual(self.titles(tags=['math'], priorities=['high']), ["Both"])
+        self.assertEqual(self.titles(statuses=['unknown']), [])
+
+
+class RequestSearchTests(TestCase):
+    """Full-text search matches every term, the last as a prefix, and follows edits and deletes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.projector = Request.objects.create(
+            user=cls.student, title="Projector replacement", description="The lab projector flickers",
+        )
+        cls.laptop = Request.objects.create(
+            user=cls.student, title="Laptop loan", description="Need a laptop for the thesis defense",
+        )
+
+    def found(self, query):
+        return set(search_requests(Request.objects.all(), query).values_list('id', flat=True))
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.found("projector"), {self.projector.id})
+        self.assertEqual(self.found("laptop thesis"), {self.laptop.id})
+        self.assertEqual(self.found("laptop projector"), set())
+
+    def test_last_term_is_a_prefix(self):
+        self.assertEqual(self.found("proj"), {self.projector.id})
+        self.assertEqual(self.found("thesis def"), {self.laptop.id})
+
+    def test_results_are_ranked(self):
+        results = list(search_requests(Request.objects.all(), "laptop"))
+        self.assertEqual(len(results), 1)
+        self.assertIsNotNone(results[0].search_rank)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.projector.title = "Whiteboard markers"
+        self.projector.description = "Out of markers"
+        self.projector.save()
+        self.assertEqual(self.found("projector"), set())
+        self.assertEqual(self.found("whiteboard"), {self.projector.id})
+
+        self.laptop.delete()
+        self.assertEqual(self.found("laptop"), set())
+
+    def test_operators_and_quotes_are_treated_as_words(self):
+        for query in ['"projector', 'projector OR NEAR(', 'proj* AND -', "'); DROP", '""', '(']:
+            self.found(query)
+        self.assertEqual(self.found('"projector OR NEAR('), set())
+        self.assertEqual(self.found('projector" *'), {self.projector.id})
+        self.assertEqual(self.found('   '), {self.projector.id, self.laptop.id})
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite FTS5 fallback")
+    def test_install_restores_missing_triggers_and_rebuilds(self):
+        self.assertTrue(sqlite_fts_available())
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER {FTS_TABLE}_{suffix}")
+        missed = Request.objects.create(user=self.student, title="Microscope calibration", description="x")
+        self.assertEqual(self.found("microscope"), set())
+
+        install_sqlite_fts(connection)
+        self.assertEqual(self.found("microscope"), {missed.id})
+        self.laptop.delete()
+        self.assertEqual(self.found("laptop"), set())
+
+
+class TagAutosuggestTests(TestCase):
+    """The in-process tag index answers prefix lookups and follows tag creates, deletes and renames."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.tags = {
+            name: Tag.objects.create(name=name, usage_count=usage)
+            for name, usage in [('math', 5), ('mathematics', 9), ('matrix', 1), ('physics', 3)]
+        }
+
+    def setUp(self):
+        tag_index.rebuild()
+
+    def names(self, prefix, limit=10):
+        return [tag['name'] for tag in tag_index.suggest(prefix, limit)]
+
+    def test_prefix_results_are_ranked_by_usage_and_limited(self):
+        self.assertEqual(self.names("ma"), ['mathematics', 'math', 'matrix'])
+        self.assertEqual(self.names(" MA ", limit=2), ['mathematics', 'math'])
+        self.assertEqual(self.names("phy"), ['physics'])
+        self.assertEqual(self.names("zz"), [])
+
+    def test_lookups_do_not_query_the_database(self):
+        with self.assertNumQueries(0):
+            self.names("ma")
+            self.names("mat")
+
+    def test_created_and_deleted_tags_are_picked_up_by_signals(self):
+        self.names("ma")
+        created = Tag.objects.create(name='Magnetism')
+        self.assertIn('magnetism', self.names("mag"))
+
+        created.delete()
+        self.assertEqual(self.names("mag"), [])
+        self.tags['matrix'].delete()
+        self.assertNotIn('matrix', self.names("ma"))
+
+    def test_rename_rebuilds_the_index(self):
+        self.assertEqual(self.names("phy"), ['physics'])
+        tag = self.tags['physics']
+        tag.name = 'chemistry'
+        tag.save()
+
+        self.assertEqual(self.names("phy"), [])
+        self.assertEqual(self.names("chem"), ['chemistry'])
+
+    def test_endpoint(self):
+        url = reverse('tag_autosuggest')
+        self.assertEqual(self.client.get(url, {'q': 'ma'}).status_code, 302)
+
+        self.client.force_login(self.student)
+        response = self.client.get(url, {'q': 'ma', 'limit': 1})
+        self.assertEqual(response.json()['results'], [{'name': 'mathematics', 'slug': 'mathematics', 'usage': 9}])
+        response = self.client.get(url, {'q': 'ma', 'limit': 'many'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+
+class RequestRankTests(TestCase):
+    """status_rank/priority_rank stay in step with status/priority on every write path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+
+    def setUp(self):
+        self.req = Request.objects.create(user=self.student, title="Lab access", description="x", priority='low')
+
+    def assertRanksInStep(self):
+        for req in Request.objects.all():
+            self.assertEqual(req.status_rank, Request.STATUS_RANKS[req.status])
+            self.assertEqual(req.priority_rank, Request.PRIORITY_RANKS[req.priority])
+
+    def test_create_sets_ranks(self):
+        self.assertRanksInStep()
+        self.assertEqual(Request.objects.get(id=self.req.id).priority_rank, Request.PRIORITY_RANKS['low'])
+
+    def test_update_fields_save_persists_the_rank(self):
+        self.req.status = 'cancelled'
+        self.req.save(update_fields=['status'])
+        self.req.priority = 'critical'
+        self.req.save(update_fields=['priority'])
+
+        stored = Request.objects.get(id=self.req.id)
+        self.assertEqual((stored.status, stored.priority), ('cancelled', 'critical'))
+        self.assertRanksInStep()
+
+    def test_update_fields_without_status_leaves_the_rank_alone(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.req.title = "Renamed"
+            self.req.save(update_fields=['title'])
+        update = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')][0]
+        self.assertNotIn('status_rank', update)
+
+    def test_bulk_transition_updates_ranks(self):
+        other = Request.objects.create(user=self.student, title="Other", description="x")
+        bulk_transition([self.req.id, other.id], 'approved')
+        self.assertEqual(set(Request.objects.values_list('status', flat=True)), {'approved'})
+        self.assertRanksInStep()
+
+        bulk_transition([other.id], 'cancelled')
+        self.assertRanksInStep()
+
+    def test_edit_view_updates_ranks(self):
+        self.client.force_login(self.student)
+        self.client.post(reverse('edit_request', args=[self.req.id]), {
+            'title': self.req.title, 'status': 'cancelled', 'priority': 'high',
+            'description': self.req.description, 'tags': '',
+        })
+        stored = Request.objects.get(id=self.req.id)
+        self.assertEqual((stored.status, stored.priority), ('cancelled', 'high'))
+        self.assertRanksInStep()
+
+
+class HotQueryIndexTests(TestCase):
+    """
+    EXPLAIN the hot queries of the views and context processors on a seeded
+    dataset and check each one is answered from the intended index, without
+    a separate sort step.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+        other = User.objects.create_user('other', 'other@cit.edu', 'x')
+
+        statuses = [value for value, _label in Request.STATUS_CHOICES]
+        priorities = [value for value, _label in Request.PRIORITY_CHOICES]
+        requests = []
+        for i in range(600):
+            req = Request(
+                user=(cls.student, other)[i % 2],
+                title=f"Request {i}",
+                description="Seeded request",
+                status=statuses[i % len(statuses)],
+                priority=priorities[i % len(priorities)],
+            )
+            req.sync_ranks()
+            requests.append(req)
+        Request.objects.bulk_create(requests)
+
+        Notification.objects.bulk_create(
+            Notification(user=(cls.student, other)[i % 2], message=f"Update {i}", is_read=i % 5 != 0)
+            for i in range(600)
+        )
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # The seeded tables are small; make the planner show its index choice
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), plan)
+        # An index-ordered scan needs no separate sort
+        self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan, plan)
+        self.assertNotRegex(plan, r'(?m)^\s*(->\s*)?Sort\b')
+
+    def get_request(self, user, **params):
+        request = RequestFactory().get('/', params)
+        request.user = user
+        return request
+
+    def test_student_dashboard_page(self):
+        queryset, _form = dashboard_queryset(self.get_request(self.student))
+        page = queryset.order_by(*DASHBOARD_ORDERING)[:DASHBOARD_PAGE_SIZE + 1]
+        self.assertUsesIndex(page, 'request_user_rank_order_idx')
+
+    def test_student_dashboard_status_filter(self):
+        queryset, _form = dashboard_queryset(self.get_request(self.student, status='pending'))
+        page = queryset.order_by(*DASHBOARD_ORDERING)[:DASHBOARD_PAGE_SIZE + 1]
+        self.assertUsesIndex(page, 'request_user_rank_order_idx')
+
+    def test_staff_dashboard_page(self):
+        queryset, _form = dashboard_queryset(self.get_request(self.staff))
+        page = queryset.order_by(*DASHBOARD_ORDERING)[:DASHBOARD_PAGE_SIZE + 1]
+        self.assertUsesIndex(page, 'request_rank_order_idx')
+
+    def test_staff_dashboard_pending_queue(self):
+        queryset, _form = dashboard_queryset(self.get_request(self.staff, status='pending'))
+        page = queryset.order_by(*DASHBOARD_ORDERING)[:DASHBOARD_PAGE_SIZE + 1]
+        self.assertUsesIndex(page, 'request_rank_order_idx')
+
+    def test_request_list_view(self):
+        view = RequestListView()
+        view.setup(self.get_request(self.student))
+        self.assertUsesIndex(view.get_queryset()[:view.paginate_by], 'request_user_rank_order_idx')
+
+    def test_user_requests_by_date(self):
+        self.assertUsesIndex(Request.objects.filter(user=self.student)[:20], 'request_user_date_idx')
+
+    def test_dashboard_stats_row(self):
+        plan = RequestStats.objects.filter(user_id=self.student.id).explain()
+        self.assertNotRegex(plan, r'SCAN request_app_requeststats$|Seq Scan', plan)
+
+    def test_recent_notifications(self):
+        # SQLite's foreign-key index on user_id already ends in the rowid, so either serves (user, -id)
+        self.assertUsesIndex(recent_notifications(self.student.id), 'notification_user_id_idx', 'request_app_notification_user_id_')
+
+    def test_notification_inbox_page(self):
+        newest = recent_notifications(self.student.id)[0]
+        _items, cursor = inbox_page(self.student.id)
+        older = Notification.objects.filter(user=self.student, id__lt=newest.id).order_by('-id')[:20]
+        self.assertUsesIndex(older, 'notification_user_id_idx')
+        self.assertIsNotNone(cursor)
+
+    def test_unread_notification_count(self):
+        self.assertUsesIndex(unread_queryset(self.student.id).values('id'), 'notification_user_id_idx')
+
+
+@mock.patch('eduassist_app.email_service.log_email')
+class EmailOutboxTests(TestCase):
+    """approve_request queues the email; run_email_worker delivers it through the configured backend."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x', first_name='Ana')
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+
+    def setUp(self):
+        self.req = Request.objects.create(user=self.student, title="Transcript", description="Copy please")
+        self.client.force_login(self.staff)
+
+    def approve(self):
+        return self.client.post(
+            reverse('approve_request', args=[self.req.id]),
+            {'new_status': 'approved', 'admin_message': 'Done'},
+        )
+
+    def test_status_change_queues_without_sending(self, log_email):
+        self.approve()
+        self.assertEqual(len(mail.outbox), 0)
+        item = EmailOutbox.objects.get()
+        self.assertEqual((item.status, item.to_email, item.template_name), ('pending', 'student@cit.edu', 'request_approved'))
+        self.assertEqual(Notification.objects.filter(related_request=self.req).count(), 1)
+
+    def test_worker_delivers_queued_email(self, log_email):
+        self.approve()
+        call_command('run_email_worker', once=True, concurrency=1, stdout=mock.Mock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Transcript', mail.outbox[0].subject)
+        self.assertEqual(EmailOutbox.objects.get().status, 'sent')
+
+    def test_failures_back_off_then_dead_letter(self, log_email):
+        self.approve()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('smtp down')):
+            call_command('run_email_worker', once=True, concurrency=1, stdout=mock.Mock())
+            item = EmailOutbox.objects.get()
+            self.assertEqual((item.status, item.attempts), ('pending', 1))
+            self.assertGreater(item.next_attempt_at, item.created_at)
+
+            # Make it due again and let it exhaust its attempts
+            EmailOutbox.objects.update(next_attempt_at=item.created_at)
+            call_command('run_email_worker', once=True, concurrency=1, max_attempts=2, stdout=mock.Mock())
+        item = EmailOutbox.objects.get()
+        self.assertEqual((item.status, item.attempts), ('dead', 2))
+        self.assertIn('smtp down', item.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@mock.patch('eduassist_app.email_service.log_email')
+class BulkTransitionTests(TestCase):
+    """bulk_update_status changes N requests with a fixed number of queries and keeps the counters right."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+        cls.students = [User.objects.create_user(f'student{i}', f'student{i}@cit.edu', 'x') for i in range(3)]
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+        # Seed the stats rows so the deltas have something to update
+        for user in [None, *self.students]:
+            stats.get_stats(user and user.id)
+
+    def make_requests(self, count):
+        return [
+            Request.objects.create(user=self.students[i % 3], title=f"Request {i}", description="x")
+            for i in range(count)
+        ]
+
+    def bulk(self, reqs, new_status):
+        return self.client.post(reverse('bulk_update_status'), {
+            'ids': [req.id for req in reqs], 'new_status': new_status, 'admin_message': 'Batch',
+        })
+
+    def test_query_count_does_not_grow_with_selection(self, log_email):
+        small, large = self.make_requests(3), self.make_requests(30)
+        with CaptureQueriesContext(connection) as few:
+            self.bulk(small, 'approved')
+        with CaptureQueriesContext(connection) as many:
+            self.bulk(large, 'approved')
+        self.assertEqual(len(few), len(many))
+
+    def test_rows_notifications_emails_and_counters(self, log_email):
+        reqs = self.make_requests(6)
+        reqs[0].status = 'approved'
+        reqs[0].save()
+
+        self.bulk(reqs, 'approved')
+
+        self.assertFalse(Request.objects.exclude(status='approved').exists())
+        self.assertEqual(
+            set(Request.objects.values_list('status_rank', flat=True)), {Request.STATUS_RANKS['approved']}
+        )
+        # The already-approved request is not notified twice
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(EmailOutbox.objects.filter(template_name='request_approved').count(), 5)
+        for user in [None, *self.students]:
+            expected, stored = stats.rebuild(user and user.id, fix=False)
+            self.assertEqual(expected, stored)
+
+
+class NotificationCounterTests(TestCase):
+    """Header notifications: stored unread counter, one query for the dropdown, nothing when unused."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.staff = User.objects.create_user('staff', 'staff@cit.edu', 'x', is_staff=True)
+        cls.reqs = [Request.objects.create(user=cls.student, title=f"R{i}", description="x") for i in range(5)]
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+
+    def notify(self, req):
+        Notification.objects.create(user=self.student, message="Updated", related_request=req)
+
+    def test_counter_follows_create_and_mark_read(self):
+        self.assertEqual(unread_count(self.student.id), 0)
+        for req in self.reqs[:3]:
+            self.notify(req)
+        # The count is a row every worker reads, not an entry in this process's cache
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_count(self.student.id), 3)
+
+        self.client.force_login(self.student)
+        self.client.post(reverse('mark_notifications_read'))
+        self.assertEqual(unread_count(self.student.id), 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_count(self.student.id), 0)
+
+    def test_rolled_back_notification_is_not_counted(self):
+        self.assertEqual(unread_count(self.student.id), 0)
+        try:
+            with transaction.atomic():
+                self.notify(self.reqs[0])
+                raise IntegrityError
+        except IntegrityError:
+            pass
+        self.assertEqual(unread_count(self.student.id), 0)
+
+    def test_stale_counter_is_recounted(self):
+        self.assertEqual(unread_count(self.student.id), 0)
+        # Written around the signals, as a shell script or raw SQL would
+        Notification.objects.bulk_create([Notification(user=self.student, message="Raw")])
+        self.assertEqual(unread_count(self.student.id), 0)
+
+        NotificationWatermark.objects.filter(user=self.student).update(
+            unread_counted_at=timezone.now() - timedelta(hours=2)
+        )
+        self.assertEqual(unread_count(self.student.id), 1)
+
+    @mock.patch('eduassist_app.email_service.log_email')
+    def test_bulk_transition_bumps_counter(self, log_email):
+        self.assertEqual(unread_count(self.student.id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_transition([req.id for req in self.reqs], 'approved')
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_count(self.student.id), 5)
+
+    def test_unused_context_costs_nothing(self):
+        with self.assertNumQueries(0):
+            user_notifications(self.request)
+
+    def test_header_renders_without_per_notification_queries(self):
+        for req in self.reqs:
+            self.notify(req)
+        context = user_notifications(self.request)
+        self.assertEqual(unread_count(self.student.id), 5)  # warm the counter
+        with self.assertNumQueries(2):
+            html = render_to_string('include/header.html', {**context, 'user': self.student}, request=None)
+        for req in self.reqs:
+            self.assertIn(reverse('request_detail', args=[req.id]), html)
+
+
+class NotificationWatermarkTests(TestCase):
+    """Mark-all-read moves a per-user watermark instead of updating every unread row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.other = User.objects.create_user('other', 'other@cit.edu', 'x')
+        Notification.objects.bulk_create(
+            Notification(user=user, message=f"Update {i}") for i in range(30) for user in (cls.student, cls.other)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_mark_all_read_is_constant_work(self):
+        self.assertEqual(unread_count(self.student.id), 30)
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(2):
+            mark_all_read(self.student.id)
+
+        self.assertEqual(unread_queryset(self.student.id).count(), 0)
+        self.assertEqual(unread_queryset(self.other.id).count(), 30)
+        # Rows are untouched; unread state comes from the watermark
+        self.assertEqual(Notification.objects.filter(is_read=True).count(), 0)
+
+        Notification.objects.create(user=self.student, message="New")
+        self.assertEqual(unread_queryset(self.student.id).count(), 1)
+        flags = [notification.unread for notification in recent_notifications(self.student.id)]
+        self.assertEqual(flags, [True, False, False, False, False])
+
+        mark_all_read(self.student.id)
+        self.assertEqual(NotificationWatermark.objects.get(user=self.student).read_up_to,
+                         Notification.objects.filter(user=self.student).latest('id').id)
+
+    def test_watermark_never_moves_back(self):
+        latest = Notification.objects.filter(user=self.student).latest('id').id
+        # A concurrent call that saw a newer notification already moved it further
+        NotificationWatermark.objects.create(user=self.student, read_up_to=latest + 10)
+        mark_all_read(self.student.id)
+        self.assertEqual(NotificationWatermark.objects.get(user=self.student).read_up_to, latest + 10)
+
+        # A row created without a watermark (e.g. by the unread counter) is still moved up
+        mark_all_read(self.other.id)
+        NotificationWatermark.objects.filter(user=self.other).update(read_up_to=0)
+        mark_all_read(self.other.id)
+        self.assertEqual(NotificationWatermark.objects.get(user=self.other).read_up_to,
+                         Notification.objects.filter(user=self.other).latest('id').id)
+        self.assertEqual(unread_count(self.other.id), 0)
+
+    def test_inbox_walks_history_with_keyset_cursor(self):
+        self.client.force_login(self.student)
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(reverse('notification_inbox'), {'cursor': cursor} if cursor else {})
+            seen += [notification.id for notification in response.context['notifications']]
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        expected = list(Notification.objects.filter(user=self.student).order_by('-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+
+@override_settings(NOTIFICATION_RETENTION_DAYS=30, NOTIFICATION_UNREAD_RETENTION_DAYS=0)
+class NotificationRetentionTests(TestCase):
+    """The purge removes expired notifications in bounded batches and leaves the rest."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        old = timezone.now() - timedelta(days=60)
+        Notification.objects.bulk_create(
+            Notification(user=cls.student, message=f"Old {i}", is_read=i < 4) for i in range(8)
+        )
+        Notification.objects.update(created_at=old)
+        # Marked read through the watermark rather than the flag
+        NotificationWatermark.objects.create(
+            user=cls.student, read_up_to=Notification.objects.order_by('id')[5].id,
+        )
+        Notification.objects.create(user=cls.student, message="Recent", is_read=True)
+
+    def test_purges_old_read_notifications_in_batches(self):
+        batches = []
+        removed = purge_expired(batch_size=2, on_batch=lambda count, last_id: batches.append(count))
+
+        self.assertEqual(removed, 6)
+        self.assertEqual(batches, [2, 2, 2])
+        remaining = list(Notification.objects.order_by('id').values_list('message', flat=True))
+        self.assertEqual(remaining, ["Old 6", "Old 7", "Recent"])
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_archives_and_resumes(self):
+        purge_expired(batch_size=2, archive=True, max_batches=1)
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+
+        call_command('purge_notifications', '--archive', '--batch-size=2', stdout=StringIO())
+        self.assertEqual(NotificationArchive.objects.count(), 6)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(
+            sorted(NotificationArchive.objects.values_list('message', flat=True)),
+            [f"Old {i}" for i in range(6)],
+        )
+
+    @override_settings(NOTIFICATION_UNREAD_RETENTION_DAYS=45)
+    def test_unread_retention_refreshes_badge(self):
+        cache.clear()
+        self.assertEqual(unread_count(self.student.id), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_expired(), 8)
+        self.assertEqual(unread_count(self.student.id), 0)
+
+
+@override_settings(SSE_ENABLED=True, SSE_POLL_INTERVAL=60, SSE_HEARTBEAT_INTERVAL=60)
+class NotificationStreamTests(TestCase):
+    """SSE endpoint and the per-worker broadcaster."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('student', 'student@cit.edu', 'x')
+        cls.other = User.objects.create_user('other', 'other@cit.edu', 'x')
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_one_poll_fans_out_to_the_right_streams(self):
+        hub = NotificationBroadcaster()
+        mine = [hub.subscribe(self.student.id), hub.subscribe(self.student.id)]
+        theirs = hub.subscribe(self.other.id)
+        hub._task.cancel()  # drive the polls by hand
+        hub._last_id = 0
+
+        notification = await Notification.objects.acreate(user=self.student, message="Approved")
+        await hub.tick()
+
+        for subscription in mine:
+            event = subscription.queue.get_nowait()
+            self.assertEqual((event['event'], event['id']), ('notification', notification.id))
+            self.assertEqual(subscription.queue.get_nowait(), {'event': 'unread', 'data': {'count': 1}})
+        self.assertEqual(theirs.queue.get_nowait(), {'event': 'unread', 'data': {'count': 0}})
+        self.assertTrue(theirs.queue.empty())
+
+        await sync_to_async(mark_all_read)(self.student.id)
+        await hub.tick()
+        for subscription in mine:
+            self.assertEqual(subscription.queue.get_nowait(), {'event': 'unread', 'data': {'count': 0}})
+        self.assertTrue(theirs.queue.empty())
+
+        hub.unsubscribe(theirs)
+        self.assertEqual(hub.count, 2)
+
+    async def test_late_commit_below_the_last_id_is_still_delivered(self):
+        hub = NotificationBroadcaster()
+        subscription = hub.subscribe(self.student.id)
+        hub._task.cancel()
+        hub._last_id = 0
+
+        # id 5 commits while the transaction holding id 3 is still open
+        await Notification.objects.acreate(id=5, user=self.student, message="Fast")
+        await hub.tick()
+        await Notification.objects.acreate(id=3, user=self.student, message="Slow")
+        await hub.tick()
+        await hub.tick()
+
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        self.assertEqual([e['id'] for e in events if e['event'] == 'notification'], [5, 3])
+        self.assertEqual(set(hub._missing), {1, 2, 4})
+
+        # Ids that never show up (rolled back) are dropped after a while
+        with mock.patch('request_app.broadcast.time.monotonic', return_value=time.monotonic() + 60):
+            await hub.tick()
+        self.assertEqual(hub._missing, {})
+
+    async def test_stream_sends_unread_count_then_new_notifications(self):
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        self.assertEqual(await anext(chunks), b'event: unread\ndata: {"count": 0}\n\n')
+
+        notification = await Notification.objects.acreate(user=self.student, message="Approved")
+        await broadcaster.tick()
+        self.assertIn(f'id: {notification.id}\nevent: notification'.encode(), await anext(chunks))
+        await chunks.aclose()
+
+    async def test_stream_delivers_a_late_lower_id_after_catch_up(self):
+        await Notification.objects.acreate(id=10, user=self.student, message="Seen")
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('notification_stream'), headers={'last-event-id': '5'})
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)  # retry
+        self.assertIn(b'id: 10\n', await anext(chunks))
+        await anext(chunks)  # unread count
+
+        broadcaster._last_id, broadcaster._missing = 10, {7: time.monotonic()}
+        await Notification.objects.acreate(id=7, user=self.student, message="Late")
+        await broadcaster.tick()
+        self.assertIn(b'id: 7\n', await anext(chunks))
+        await chunks.aclose()
+
+    async def test_connection_limit(self):
+        await self.async_client.aforce_login(self.student)
+        with self.settings(SSE_MAX_CONNECTIONS_PER_USER=0):
+            response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    async def test_disabled_stream_tells_browser_to_stop(self):
+        await self.async_client.aforce_login(self.student)
+        with self.settings(SSE_ENABLED=False):
+            response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 204)
@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from eduassist_app.email_outbox import queue_notification_emails
+
+from . import notifications, stats
+from .models import Notification, Request
+
+
+def status_message(req):
+    """In-app notification text for a request whose status just changed."""
+    return f"Your request '{req.title}' has been updated to {req.get_status_display()}."
+
+
+def status_email(req, admin_message=""):
+    """Outbox kwargs for the status-change email of a request (status already set)."""
+    if req.status == "approved":
+        template_file = "request_approved"
+        email_subject = f"Your Request '{req.title}' Has Been Approved"
+    else:
+        # pending → request_pending
+        # cancelled → request_cancelled
+        template_file = f"request_{req.status}"
+        email_subject = (
+            f"Your Request '{req.title}' Status Updated to {req.get_status_display()}"
+        )
+
+    return {
+        "subject": email_subject,
+        "to_email": req.user.email,
+        "template_name": template_file,
+        "context_data": {
+            "name": req.user.first_name,
+            "title": req.title,
+            "admin_message": admin_message,
+            "new_status": req.get_status_display(),
+        },
+    }
+
+
+def bulk_transition(request_ids, new_status, admin_message=""):
+    """
+    Move the given requests to new_status in one transaction: a single UPDATE
+    for the rows, one bulk_create for the notifications and one for the queued
+    emails. Requests already in new_status are left alone.
+    Returns the requests that changed.
+    """
+    if new_status not in Request.STATUS_RANKS:
+        raise ValueError(f"Unknown status: {new_status}")
+
+    with transaction.atomic():
+        changed = list(
+            Request.objects
+            .filter(id__in=request_ids)
+            .exclude(status=new_status)
+            .select_related('user')
+            .only('id', 'title', 'status', 'user__id', 'user__email', 'user__first_name')
+            .select_for_update(of=('self',))
+        )
+        if not changed:
+            return []
+
+        # queryset.update() skips save() and the stats signals, so the rank
+        # column and the dashboard counters are maintained here.
+        Request.objects.filter(id__in=[req.id for req in changed]).update(
+            status=new_status,
+            status_rank=Request.STATUS_RANKS[new_status],
+            updated_at=timezone.now(),
+        )
+        stats.apply_deltas((req.user_id, req.status, new_status) for req in changed)
+
+        for req in changed:
+            req.status = new_status
+
+        Notification.objects.bulk_create([
+            Notification(user_id=req.user_id, message=status_message(req), related_request=req)
+            for req in changed
+        ], batch_size=500)
+        # bulk_create sends no post_save, so bump the unread badges here
+        notifications.unread_added(Counter(req.user_id for req in changed))
+        queue_notification_emails(status_email(req, admin_message) for req in changed)
+
+    return changed
@@ -5,6 +5,7 @@ urlpatterns = [
     # Landing / Dashboard
     path('', views.landing_page, name='landing'),
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('dashboard/more/', views.dashboard_more, name='dashboard_more'),
 
     # Requests
     path('requests/<int:id>/', views.request_detail, name='request_detail'),
@@ -13,7 +14,12 @@ urlpatterns = [
     path('add/', views.add_request, name='add_request'),
     path('create-category/', views.create_category, name='create_category'),
     path('requests/<int:id>/approve/', views.approve_request, name='approve_request'),
+    path('requests/bulk-status/', views.bulk_update_status, name='bulk_update_status'),
+    path('notifications/', views.notification_inbox, name='notification_inbox'),
     path('notifications/mark-read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('api/tags/autosuggest/', views.tag_autosuggest, name='tag_autosuggest'),
+    path('api/categories/', views.category_catalog, name='category_catalog'),
     # # Categories and Tags (if you have function-based views for them)
     # path('categories/', views.category_list, name='category-list'),
     # path('tags/', views.tag_list, name='tag-list'),
@@ -2,11 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseForbidden
-from django.db.models import Q, Count, Case, When, Value, IntegerField # <-- ADDED Case, When, Value, IntegerField
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import F
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.template.loader import render_to_string
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_GET
 
 from .models import Request, Category, CategoryChoice, Tag, Notification
 from .forms import SearchForm, RequestForm
@@ -15,78 +19,93 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .serializers import RequestSerializer, TagSerializer
-from eduassist_app.email_service import send_notification_email
+from .stats import dashboard_counts
+from .pagination import keyset_page
+from .search import search_requests
+from .tag_index import tag_index
+from .tagging import parse_tag_names, resolve_tags, set_request_tags
+from .catalog import catalog_etag, catalog_json, get_catalog
+from .filters import filter_requests
+from .notifications import inbox_page, mark_all_read
+from .broadcast import broadcaster, event_stream
+from .transitions import bulk_transition, status_email, status_message
+from eduassist_app.email_outbox import queue_notification_email
 
 # from eduassist_app.utils import send_notification_email
 # ------------------------
 # Dashboard (Updated for Priority Sorting)
 # ------------------------
-@login_required(login_url='login')
-def dashboard_view(request):
-    # Ensure necessary imports are available at the top of your views.py:
-    # from django.db.models import Case, When, Value, IntegerField, Q
-    # from django.shortcuts import render
-    # from django.contrib.auth.decorators import login_required
-    # ... and your Request model
-    
-    # Initialization and QuerySet setup remains the same
-    form = SearchForm(request.GET or None)
-    
+DASHBOARD_PAGE_SIZE = 20
+DASHBOARD_ORDERING = ['status_rank', 'priority_rank', '-date', '-id']
+
+
+def dashboard_queryset(request):
+    """
+    Requests visible on the dashboard with the status/search filters applied in SQL,
+    ready for the Status -> Priority -> Date ordering used by keyset pagination.
+    """
     if request.user.is_staff:
-        base_queryset = Request.objects.all()
+        queryset = Request.objects.all()
     else:
-        base_queryset = Request.objects.filter(user=request.user)
-        
-    non_cancelled_queryset = base_queryset.exclude(status='cancelled')
-    total_count = non_cancelled_queryset.count() 
-    pending_count = base_queryset.filter(status='pending').count()
-    approved_count = base_queryset.filter(status='approved').count()
-
-    # 3. Apply custom ordering (Status -> Priority -> Date)
-    requests = base_queryset.annotate(
-        # Status Ordering (Pending=1, Approved=2, Cancelled=3)
-        status_order=Case(
-            When(status='pending', then=Value(1)), 
-            When(status='approved', then=Value(2)), 
-            When(status='cancelled', then=Value(3)), 
-            default=Value(4),
-            output_field=IntegerField()
-        )
-    ).annotate(
-        # Priority Ordering (Critical=1, High=2, Medium=3, Low=4)
-        priority_order=Case(
-            When(priority='critical', then=Value(1)), 
-            When(priority='high', then=Value(2)), 
-            When(priority='medium', then=Value(3)), 
-            When(priority='low', then=Value(4)), 
-            default=Value(5),
-            output_field=IntegerField()
-        )
-    ).order_by('status_order', 'priority_order', '-date') # Order by: Status (asc), Priority (asc), Date (desc)
+        queryset = Request.objects.filter(user=request.user)
 
-    # 4. Apply search filter if present (filters the list of requests for the table)
+    status = request.GET.get('status')
+    if status in Request.STATUS_RANKS:
+        # Filter on the rank column so the (status_rank, priority_rank, date) indexes apply
+        queryset = queryset.filter(status_rank=Request.STATUS_RANKS[status])
+
+    form = SearchForm(request.GET or None)
     if form.is_valid():
         query = form.cleaned_data.get('search')
         if query:
-            requests = requests.filter(Q(title__icontains=query) | Q(status__icontains=query))
+            queryset = search_requests(queryset, query)
+
+    # status_rank / priority_rank are maintained on save (Pending first, Critical first)
+    queryset = queryset.only('id', 'title', 'status', 'date', 'status_rank', 'priority_rank')
+
+    return queryset, form
+
+
+@login_required(login_url='login')
+def dashboard_view(request):
+    requests_qs, form = dashboard_queryset(request)
+
+    # Header counters come from the maintained RequestStats row (one indexed read)
+    counts = dashboard_counts(request.user)
+
+    # First page only; further pages come from dashboard_more (keyset cursor)
+    requests, next_cursor = keyset_page(requests_qs, DASHBOARD_ORDERING, page_size=DASHBOARD_PAGE_SIZE)
 
     context = {
         'requests': requests, 
+        'next_cursor': next_cursor,
         'form': form,
-        'total_count': total_count, 
-        'pending_count': pending_count, 
-        'approved_count': approved_count,
+        'current_status': request.GET.get('status', 'all'),
+        'status_choices': Request.STATUS_CHOICES,
+        **counts,
     }
 
     return render(request, 'Home/dashboard.html', context)
 
+
+@login_required(login_url='login')
+def dashboard_more(request):
+    """Load-more fragment: the page of dashboard cards after the given cursor."""
+    requests_qs, _ = dashboard_queryset(request)
+    requests, next_cursor = keyset_page(
+        requests_qs, DASHBOARD_ORDERING, cursor=request.GET.get('cursor'), page_size=DASHBOARD_PAGE_SIZE
+    )
+
+    html = render_to_string('Home/_request_list_items.html', {'requests': requests}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
 # ------------------------
 # Request Detail
 # ------------------------
 @login_required
 def request_detail(request, id):
     req = get_object_or_404(Request, id=id)
-    categories = Category.objects.all()
+    categories = get_catalog()['categories']
     return render(request, 'Home/request_detail.html', {
         'req': req,
         'request_obj': req, # required for modal pre-fill
@@ -98,8 +117,7 @@ def request_detail(request, id):
 # ------------------------
 @login_required
 def add_request(request):
-    categories = Category.objects.all()
-    category_choices = CategoryChoice.objects.all()
+    catalog = get_catalog()
 
     if request.method == "POST":
         title = request.POST.get('title')
@@ -111,8 +129,15 @@ def add_request(request):
         attachment = request.FILES.get('attachment')
         tags_input = request.POST.get('tags')
 
-        category = Category.objects.get(id=category_id) if category_id else None
-        category_choice = CategoryChoice.objects.get(id=category_choice_id) if category_choice_id else None
+        # Validate the ids against the cached catalog instead of fetching the rows.
+        # An id missing from it may be newer than this worker's copy, so reload
+        # once before saving it as "no category".
+        category_id = int(category_id) if category_id and category_id.isdigit() else None
+        category_choice_id = int(category_choice_id) if category_choice_id and category_choice_id.isdigit() else None
+        if (category_id is not None and category_id not in catalog['categories_by_id']) or (
+            category_choice_id is not None and category_choice_id not in catalog['choices_by_id']
+        ):
+            catalog = get_catalog(refresh=True)
 
         new_request = Request.objects.create(
             user=request.user,
@@ -120,23 +145,21 @@ def add_request(request):
             status=status, 
             priority=priority,
             description=description,
-            category=category,
-            category_choice=category_choice,
+            category_id=category_id if category_id in catalog['categories_by_id'] else None,
+            category_choice_id=category_choice_id if category_choice_id in catalog['choices_by_id'] else None,
             attachment=attachment
         )
 
-        if tags_input:
-            tag_names = [t.strip().lower() for t in tags_input.split(',') if t.strip()]
-            for tag_name in tag_names:
-                tag, _ = Tag.objects.get_or_create(name=tag_name)
-                new_request.tags.add(tag)
+        tag_names = parse_tag_names(tags_input)
+        if tag_names:
+            new_request.tags.add(*resolve_tags(tag_names))
 
         
         return redirect('dashboard')
 
+    # Query types are loaded by the page from category_catalog
     return render(request, 'Home/add_request.html', {
-        'categories': categories,
-        'category_choices': category_choices
+        'categories': catalog['categories'],
     })
 
 # ------------------------
@@ -155,32 +178,39 @@ def edit_request(request, id):
     if not request.user == req.user:
         return HttpResponseForbidden() # Should only happen if the user isn't staff OR the creator
 
-    categories = Category.objects.all()
-    category_choices = CategoryChoice.objects.all()
-    current_tags_str = ", ".join([t.name for t in req.tags.all()])
+    categories = get_catalog()['categories']
+    current_tags = list(req.tags.all())
+    current_tags_str = ", ".join([t.name for t in current_tags])
 
     if request.method == 'POST':
         # --- Start POST logic ---
-        req.title = request.POST.get('title')
-        req.status = request.POST.get('status') 
-        req.priority = request.POST.get('priority')
-        req.category_id = request.POST.get('category')
-        req.category_choice_id = request.POST.get('category_choice')
-        req.description = request.POST.get('description')
+        submitted = {
+            'title': request.POST.get('title'),
+            'status': request.POST.get('status'),
+            'priority': request.POST.get('priority'),
+            'category_id': request.POST.get('category') or None,
+            'category_choice_id': request.POST.get('category_choice') or None,
+            'description': request.POST.get('description'),
+        }
+        changed_fields = []
+        for attname, value in submitted.items():
+            field = Request._meta.get_field(attname.removesuffix('_id'))
+            value = field.to_python(value)
+            if getattr(req, attname) != value:
+                setattr(req, attname, value)
+                changed_fields.append(field.name)
 
         if 'attachment' in request.FILES:
             req.attachment = request.FILES['attachment']
+            changed_fields.append('attachment')
         
-        # Handle Tags update
-        req.tags.clear() 
-        tags_input = request.POST.get('tags')
-        if tags_input:
-            tag_names = [t.strip().lower() for t in tags_input.split(',') if t.strip()]
-            for tag_name in tag_names:
-                tag, _ = Tag.objects.get_or_create(name=tag_name)
-                req.tags.add(tag)
+        # Handle Tags update: only the added/removed links are written
+        tags_changed = set_request_tags(
+            req, parse_tag_names(request.POST.get('tags')), current_ids={t.id for t in current_tags}
+        )
         
-        req.save()
+        if changed_fields or tags_changed:
+            req.save(update_fields=changed_fields + ['updated_at'])
         # --- End POST logic ---
 
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -192,7 +222,6 @@ def edit_request(request, id):
     context = {
         'request_obj': req,
         'categories': categories,
-        'category_choices': category_choices,
         'current_tags_str': current_tags_str
     }
 
@@ -234,44 +263,51 @@ class RequestListView(LoginRequiredMixin, ListView):
     context_object_name = 'requests'
     paginate_by = 10
 
+    def get_list_param(self, name):
+        """Values of a filter given as repeated (?tag=a&tag=b) or comma-separated (?tag=a,b) params."""
+        values = []
+        for raw in self.request.GET.getlist(name):
+            values.extend(v.strip() for v in raw.split(',') if v.strip())
+        return values
+
     def get_queryset(self):
         queryset = Request.objects.prefetch_related('tags').all()
-        category_value = self.request.GET.get('category')
-        tag_slug = self.request.GET.get('tag')
-        status = self.request.GET.get('status')
         search = self.request.GET.get('q')
 
-        if category_value:
-            queryset = queryset.filter(category_id=category_value)
-        if tag_slug:
-            queryset = queryset.filter(tags__slug=tag_slug)
-        if status:
-            queryset = queryset.filter(status=status)
+        # Tags: ?tag_mode=all requires every tag (AND), otherwise any of them (OR)
+        queryset = filter_requests(
+            queryset,
+            tags=self.get_list_param('tag'),
+            tag_mode=self.request.GET.get('tag_mode', 'any'),
+            categories=[c for c in self.get_list_param('category') if c.isdigit()],
+            statuses=self.get_list_param('status'),
+            priorities=self.get_list_param('priority'),
+        )
         if search:
-            queryset = queryset.filter(Q(title__icontains=search) | Q(description__icontains=search))
+            queryset = search_requests(queryset, search)
 
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
             
         # Apply Custom Priority Sorting: Pending (1) -> Approved (2) -> Cancelled (3)
-        queryset = queryset.annotate(
-            status_order=Case(
-                When(status='pending', then=Value(1)),
-                When(status='approved', then=Value(2)),
-                When(status='cancelled', then=Value(3)),
-                default=Value(4),
-                output_field=IntegerField()
-            )
-        ).order_by('status_order', '-date') # Order by priority, then by latest date
-
-        return queryset.distinct()
+        if search:
+            # Best full-text matches first
+            queryset = queryset.order_by('-search_rank', 'status_rank', 'priority_rank', '-date')
+        else:
+            queryset = queryset.order_by('status_rank', 'priority_rank', '-date', '-id') # Order by status, priority, then by latest date
+
+        # Tag filters are EXISTS subqueries, so no DISTINCT is needed
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
-        context['tags'] = Tag.objects.annotate(request_count=Count('requests')).filter(request_count__gt=0).order_by('name')
+        context['categories'] = get_catalog()['categories']
+        context['tags'] = Tag.objects.filter(usage_count__gt=0).annotate(request_count=F('usage_count')).order_by('name')
         context['current_category'] = self.request.GET.get('category')
         context['current_tag'] = self.request.GET.get('tag')
+        context['current_tags'] = self.get_list_param('tag')
+        context['current_tag_mode'] = self.request.GET.get('tag_mode', 'any')
+        context['current_priority'] = self.request.GET.get('priority')
         context['current_status'] = self.request.GET.get('status')
         context['current_search'] = self.request.GET.get('q')
         return context
@@ -298,9 +334,8 @@ def create_category(request):
 
         return redirect('create_category')
 
-    categories = Category.objects.all()
-    choices = CategoryChoice.objects.all()
-    return render(request, "Home/create_category.html", {"categories": categories, "choices": choices})
+    catalog = get_catalog()
+    return render(request, "Home/create_category.html", {"categories": catalog['categories'], "choices": catalog['choices']})
 
 # ------------------------
 # Approve/Update Request Status (Admin Action)
@@ -319,52 +354,25 @@ def approve_request(request, id):
         admin_message = request.POST.get("admin_message", "")
 
         is_status_changed = req.status != new_status
-        req.status = new_status
-        req.save()
 
-        # Only send email AND notification if status changed
-        if is_status_changed:
+        # Status, notification and outgoing email commit together; the email is
+        # delivered afterwards by the outbox worker, so SMTP never blocks this view.
+        with transaction.atomic():
+            req.status = new_status
+            req.save()
 
-            # =======================================================
-            # 1. CREATE NOTIFICATION (This was missing!)
-            # =======================================================
-            try:
+            # Only send email AND notification if status changed
+            if is_status_changed:
+
+                # 1. CREATE NOTIFICATION
                 Notification.objects.create(
                     user=req.user,  # Alert the Student
-                    message=f"Your request '{req.title}' has been updated to {req.get_status_display()}.",
+                    message=status_message(req),
                     related_request=req
                 )
-            except Exception as e:
-                print(f"Error creating notification: {e}")
-            # =======================================================
-
-            # 2. SELECT TEMPLATE + SUBJECT
-            if new_status == "approved":
-                template_file = "request_approved"
-                email_subject = f"Your Request '{req.title}' Has Been Approved"
-            else:
-                # pending → request_pending
-                # cancelled → request_cancelled
-                template_file = f"request_{new_status}"
-                email_subject = (
-                    f"Your Request '{req.title}' Status Updated to {req.get_status_display()}"
-                )
 
-            # 3. SEND EMAIL
-            try:
-                send_notification_email(
-                    subject=email_subject,
-                    to_email=req.user.email,
-                    template_name=template_file,
-                    context_data={
-                        "name": req.user.first_name,
-                        "title": req.title,
-                        "admin_message": admin_message,
-                        "new_status": req.get_status_display(),
-                    }
-                )
-            except Exception as e:
-                messages.warning(request, f"Request updated, but email failed: {e}")
+                # 2. QUEUE EMAIL (template + subject follow the new status)
+                queue_notification_email(**status_email(req, admin_message))
 
         messages.success(
             request,
@@ -383,12 +391,97 @@ def approve_request(request, id):
         },
     )
 
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def bulk_update_status(request):
+    """Apply one status change to every selected dashboard request."""
+    if request.method != "POST":
+        return redirect("dashboard")
+
+    new_status = request.POST.get("new_status")
+    request_ids = [int(value) for value in request.POST.getlist("ids") if value.isdigit()]
+
+    if new_status not in Request.STATUS_RANKS or not request_ids:
+        messages.error(request, "Select at least one request and a status.")
+        return redirect("dashboard")
+
+    changed = bulk_transition(request_ids, new_status, request.POST.get("admin_message", ""))
+    messages.success(
+        request,
+        f"{len(changed)} request(s) changed to '{dict(Request.STATUS_CHOICES)[new_status]}' and their owners notified."
+    )
+    return redirect("dashboard")
+
 @login_required
 def mark_notifications_read(request):
     if request.method == "POST":
-        # Update all unread notifications for this user to read=True
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        # Moves the user's read watermark; no per-notification writes
+        mark_all_read(request.user.id)
         return JsonResponse({'success': True})
     
     return JsonResponse({'success': False}, status=400)
 
+
+@login_required
+def notification_inbox(request):
+    """Full notification history, newest first, one keyset page at a time."""
+    notifications, next_cursor = inbox_page(request.user.id, cursor=request.GET.get('cursor'))
+    return render(request, 'Home/notifications.html', {
+        'notifications': notifications,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+    })
+
+
+# ------------------------
+# Live Notifications (Server-Sent Events, ASGI only)
+# ------------------------
+@login_required
+@require_GET
+async def notification_stream(request):
+    """
+    Streams new notifications and unread-count changes to the header bell.
+    See SSE_* in settings for the connection limits.
+    """
+    if not settings.SSE_ENABLED:
+        # 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    if not broadcaster.has_capacity(user.id):
+        response = HttpResponse("Too many notification streams.", status=503)
+        response['Retry-After'] = '60'
+        return response
+
+    return StreamingHttpResponse(
+        event_stream(user.id, request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+# ------------------------
+# Tag Autosuggest (used by the RequestForm tag widget)
+# ------------------------
+@login_required
+def tag_autosuggest(request):
+    prefix = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    # Served from the in-process prefix index; no database query per keystroke
+    return JsonResponse({'results': tag_index.suggest(prefix, limit)})
+
+
+# ------------------------
+# Category Catalog (cascading Category -> Query Type dropdowns)
+# ------------------------
+@login_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@etag(catalog_etag)
+def category_catalog(request):
+    # Browsers revalidate with If-None-Match and get a 304 until a category changes
+    return JsonResponse(catalog_json())
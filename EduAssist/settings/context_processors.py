@@ -1,7 +1,8 @@
-from .models import UserSettings
+from django.utils.functional import SimpleLazyObject
+
+from .user_settings import dark_mode
+
 
 def theme_settings(request):
-    if request.user.is_authenticated:
-        settings = UserSettings.objects.filter(user=request.user).first()
-        return {"global_dark_mode": settings.dark_mode if settings else False}
-    return {"global_dark_mode": False}
+    # Lazy and shared with ThemeMiddleware: at most one lookup per request
+    return {"global_dark_mode": SimpleLazyObject(lambda: dark_mode(request))}
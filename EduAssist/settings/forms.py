@@ -5,4 +5,4 @@ from .models import UserSettings
 class UserSettingsForm(forms.ModelForm):
     class Meta:
         model = UserSettings
-        fields = ['is_dark_mode', 'receive_email_notifications', 'profile_visibility']
+        fields = ['dark_mode', 'receive_email', 'profile_visible']
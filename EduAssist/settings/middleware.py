@@ -1,26 +1,37 @@
 # EduAssist/settings/middleware.py
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
-from django.contrib.auth.models import AnonymousUser
-from .models import UserSettings
+
+from .user_settings import THEME_COOKIE, THEME_COOKIE_MAX_AGE, dark_mode
+
 
 class ThemeMiddleware(MiddlewareMixin):
     """
-    Set a cookie 'dark_mode'='1' or '0' on every response for authenticated users.
-    This avoids relying on template context and works for all response types.
+    Keep the 'dark_mode' cookie ('1' or '0') in line with the user's settings,
+    so theme-cookie.js can apply the theme on any page.
+
+    Only HTML pages are considered: streamed, static-file, JSON and redirect
+    responses are passed through untouched (a redirect's target sets it).
+    Set-Cookie is sent only when the value the browser sent differs from the
+    user's setting.
     """
 
     def process_response(self, request, response):
+        if not self.wants_theme(request, response):
+            return response
         try:
-            user = getattr(request, "user", None)
-            if user and user.is_authenticated and not isinstance(user, AnonymousUser):
-                settings = UserSettings.objects.filter(user=user).first()
-                dark = settings.dark_mode if settings else False
-                # cookie value as string '1' or '0'
-                response.set_cookie("dark_mode", "1" if dark else "0", max_age=30*24*3600, path="/")
-            else:
-                # For anonymous users, ensure cookie is removed or set to 0
-                response.set_cookie("dark_mode", "0", max_age=30*24*3600, path="/")
+            value = "1" if dark_mode(request) else "0"
+            # No cookie reads as light mode, so anonymous visitors usually get nothing
+            if request.COOKIES.get(THEME_COOKIE, "0") != value:
+                response.set_cookie(THEME_COOKIE, value, max_age=THEME_COOKIE_MAX_AGE, path="/")
         except Exception:
             # don't break responses if something goes wrong
             pass
         return response
+
+    def wants_theme(self, request, response):
+        if response.streaming or 300 <= response.status_code < 400:
+            return False
+        if settings.STATIC_URL and request.path.startswith("/" + settings.STATIC_URL.lstrip("/")):
+            return False
+        return response.get("Content-Type", "").startswith("text/html")
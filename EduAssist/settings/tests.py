@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .forms import UserSettingsForm
+from .models import UserSettings
+from .user_settings import THEME_COOKIE
+
+
+class ThemeCookieTests(TestCase):
+    """UserSettings is looked up at most once per request; the cookie is only sent when it changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('student', 'student@cit.edu', 'x')
+        UserSettings.objects.create(user=cls.user, dark_mode=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def settings_queries(self, method, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url)
+        return response, sum('settings_usersettings' in query['sql'] for query in queries)
+
+    def test_one_lookup_per_page_and_cookie_set_once(self):
+        response, lookups = self.settings_queries('get', reverse('notification_inbox'))
+        self.assertEqual(lookups, 1)
+        self.assertEqual(response.cookies[THEME_COOKIE].value, "1")
+
+        # The browser now sends the cookie back; it matches, so nothing is rewritten
+        response, lookups = self.settings_queries('get', reverse('notification_inbox'))
+        self.assertEqual(lookups, 1)
+        self.assertNotIn(THEME_COOKIE, response.cookies)
+
+    def test_json_responses_skip_the_theme(self):
+        response, lookups = self.settings_queries('post', reverse('mark_notifications_read'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(lookups, 0)
+        self.assertNotIn(THEME_COOKIE, response.cookies)
+
+    def test_changes_made_elsewhere_show_on_the_next_page(self):
+        self.client.get(reverse('notification_inbox'))
+        # e.g. through the admin, or a request handled by another worker
+        UserSettings.objects.filter(user=self.user).update(dark_mode=False)
+
+        response = self.client.get(reverse('notification_inbox'))
+        self.assertEqual(response.cookies[THEME_COOKIE].value, "0")
+        self.assertFalse(response.context['global_dark_mode'])
+
+    def test_form_uses_model_fields(self):
+        self.assertEqual(list(UserSettingsForm().fields), ['dark_mode', 'receive_email', 'profile_visible'])
@@ -0,0 +1,25 @@
+from .models import UserSettings
+
+THEME_COOKIE = 'dark_mode'
+THEME_COOKIE_MAX_AGE = 30 * 24 * 3600
+
+
+def get_user_settings(request):
+    """
+    Settings of the request's user, loaded at most once per request and
+    shared by ThemeMiddleware and the theme_settings context processor.
+    Not cached across requests, so a change made anywhere (another worker,
+    the admin) shows on the next page. None for anonymous users and users
+    who never saved their settings.
+    """
+    if not hasattr(request, '_user_settings'):
+        user = getattr(request, 'user', None)
+        request._user_settings = (
+            UserSettings.objects.filter(user_id=user.id).first() if user and user.is_authenticated else None
+        )
+    return request._user_settings
+
+
+def dark_mode(request):
+    settings = get_user_settings(request)
+    return settings.dark_mode if settings else False